@@ -0,0 +1,148 @@
+"""
+All-pairs shortest paths with NumPy.
+
+The graph is turned into a dense n x n weight matrix (node ids follow
+graph.nodes) and solved with Floyd-Warshall. Each of the n rounds is one
+vectorized update of the whole matrix, applied in blocks of BLOCK_ROWS rows
+so the working set stays in cache and the temporaries stay small. A
+predecessor matrix is updated alongside: predecessors[i, j] is the node
+before j on a shortest path from i, -1 when there is none.
+
+The work is O(n^3), meant for graphs of a few thousand nodes. Results are
+cached on disk as .npy files named after Graph.content_hash and opened
+memory-mapped, so a repeated run looks up any pair without recomputing.
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from config import APSP_CACHE_DIR
+
+# Rows of the distance matrix updated together in one vectorized step
+BLOCK_ROWS = 256
+
+
+def weight_matrix(graph) -> np.ndarray:
+    """Dense matrix of the lightest edge weight between each pair of nodes, inf without an edge, 0 on the diagonal"""
+    ids = {node: i for i, node in enumerate(graph.nodes)}
+    n = len(graph.nodes)
+    weights = np.full((n, n), np.inf)
+    if graph.edges:
+        starts = np.fromiter((ids[edge.start] for edge in graph.edges), dtype=np.int64, count=len(graph.edges))
+        ends = np.fromiter((ids[edge.end] for edge in graph.edges), dtype=np.int64, count=len(graph.edges))
+        values = np.fromiter((edge.value for edge in graph.edges), dtype=np.float64, count=len(graph.edges))
+        # Parallel edges keep the lightest weight
+        np.minimum.at(weights, (starts, ends), values)
+        np.minimum.at(weights, (ends, starts), values)
+    np.fill_diagonal(weights, 0)
+    return weights
+
+
+def floyd_warshall(weights: np.ndarray, block_rows: int = BLOCK_ROWS):
+    """Returns (distances, predecessors) for a dense weight matrix"""
+    n = len(weights)
+    distances = weights.astype(np.float64, copy=True)
+    predecessors = np.where(np.isfinite(weights), np.arange(n, dtype=np.int32)[:, None], -1).astype(np.int32)
+    np.fill_diagonal(predecessors, -1)
+
+    block_rows = max(1, min(block_rows, n))
+    via = np.empty((block_rows, n))
+    better = np.empty((block_rows, n), dtype=bool)
+
+    for k in range(n):
+        # Row k does not change in round k since distances[k, k] is 0
+        row_k = distances[k]
+        predecessors_k = predecessors[k]
+        reachable = np.flatnonzero(np.isfinite(distances[:, k]))
+        for first in range(0, len(reachable), block_rows):
+            rows = reachable[first:first + block_rows]
+            count = len(rows)
+            block = distances[rows]
+            np.add(block[:, k, None], row_k, out=via[:count])
+            np.less(via[:count], block, out=better[:count])
+            if not better[:count].any():
+                continue
+            np.copyto(block, via[:count], where=better[:count])
+            distances[rows] = block
+            block_predecessors = predecessors[rows]
+            np.copyto(block_predecessors, predecessors_k, where=better[:count])
+            predecessors[rows] = block_predecessors
+
+    return distances, predecessors
+
+
+class DistanceMatrix:
+    def __init__(self, names: List[str], distances: np.ndarray, predecessors: np.ndarray, integer: bool = True):
+        self.names = names
+        self.distances = distances
+        self.predecessors = predecessors
+        # Integer weighted graphs report integer distances
+        self.integer = integer
+        self._index = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def compute(cls, graph) -> "DistanceMatrix":
+        distances, predecessors = floyd_warshall(weight_matrix(graph))
+        return cls([node.name for node in graph.nodes], distances, predecessors,
+                   all(isinstance(edge.value, int) for edge in graph.edges))
+
+    def _id(self, node) -> int:
+        """Accepts a node id, a node name or a node object"""
+        if isinstance(node, (int, np.integer)):
+            return int(node)
+        return self._index[node if isinstance(node, str) else node.name]
+
+    def distance(self, start, end) -> Optional[float]:
+        """Shortest distance between two nodes, None when unreachable"""
+        distance = self.distances[self._id(start), self._id(end)]
+        if not np.isfinite(distance):
+            return None
+        return int(distance) if self.integer else float(distance)
+
+    def path(self, start, end) -> List[int]:
+        """Node ids of a shortest path from start to end, [] when unreachable"""
+        start, end = self._id(start), self._id(end)
+        if not np.isfinite(self.distances[start, end]):
+            return []
+        path = [end]
+        while path[-1] != start:
+            path.append(int(self.predecessors[start, path[-1]]))
+        path.reverse()
+        return path
+
+    def save(self, directory: str, fingerprint: str):
+        """Writes the matrices to directory as <fingerprint>.distances.npy and .predecessors.npy"""
+        os.makedirs(directory, exist_ok=True)
+        root = os.path.join(directory, fingerprint)
+        for kind, matrix in (("distances", self.distances), ("predecessors", self.predecessors)):
+            temporary = f"{root}.{kind}.tmp.npy"
+            np.save(temporary, matrix)
+            os.replace(temporary, f"{root}.{kind}.npy")
+
+    @classmethod
+    def load(cls, graph, directory: str, fingerprint: str) -> Optional["DistanceMatrix"]:
+        """Maps the cached matrices of fingerprint read-only, None when they are not cached"""
+        root = os.path.join(directory, fingerprint)
+        try:
+            distances = np.load(f"{root}.distances.npy", mmap_mode='r')
+            predecessors = np.load(f"{root}.predecessors.npy", mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if distances.shape != (len(graph.nodes), len(graph.nodes)) or predecessors.shape != distances.shape:
+            return None
+        return cls([node.name for node in graph.nodes], distances, predecessors,
+                   all(isinstance(edge.value, int) for edge in graph.edges))
+
+
+def all_pairs(graph, cache_dir: str = APSP_CACHE_DIR) -> DistanceMatrix:
+    """The distance matrix of graph, from the disk cache when it was computed before (cache_dir None disables it)"""
+    if cache_dir is None:
+        return DistanceMatrix.compute(graph)
+
+    fingerprint = graph.content_hash()
+    matrix = DistanceMatrix.load(graph, cache_dir, fingerprint)
+    if matrix is None:
+        matrix = DistanceMatrix.compute(graph)
+        matrix.save(cache_dir, fingerprint)
+    return matrix
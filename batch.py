@@ -0,0 +1,215 @@
+"""
+Batch many-to-many shortest path distances.
+
+Queries are grouped by source so a single Dijkstra tree answers every target
+of that source. The groups are spread over a ProcessPoolExecutor. The CSR
+arrays of the graph are written once to a memory-mapped file that every
+worker maps read-only, so no graph data is pickled per task. Targets outside
+the connected component of their source are answered as unreachable without
+a search, and the sources of the largest components are solved first.
+
+    python batch.py graph.json --sources A B --targets C D E
+    python batch.py graph.json --pairs pairs.csv --output distances.csv
+    python batch.py graph.json --all --workers 8
+"""
+import argparse
+import csv
+import mmap
+import os
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from compact_graph import CompactGraph, csr_dijkstra, typecode, INFINITY
+from components import component_labels
+
+# CSR buffers of the graph mapped by a worker process, set by _attach_graph
+_worker_graph = None
+
+
+def _as_compact(graph) -> CompactGraph:
+    """Accepts a CompactGraph, a Graph or a path to a graph file"""
+    if isinstance(graph, CompactGraph):
+        return graph
+    if isinstance(graph, (str, os.PathLike)):
+        return CompactGraph.from_file(graph)
+    return CompactGraph.from_graph(graph)
+
+
+def _node_id(compact: CompactGraph, node) -> int:
+    """Accepts a node id, a node name or a node object"""
+    if isinstance(node, int):
+        return node
+    if isinstance(node, str):
+        return compact.index_of(node)
+    return compact.index_of(node.name)
+
+
+def _write_graph_file(compact: CompactGraph) -> Tuple[str, Tuple]:
+    """Writes the CSR arrays to a temporary file, returns its path and the section layout"""
+    layout = []
+    offset = 0
+    fd, path = tempfile.mkstemp(prefix="graph_csr_", suffix=".bin")
+    with os.fdopen(fd, 'wb') as f:
+        for column in (compact.offsets, compact.targets, compact.weights):
+            data = column.tobytes()
+            f.write(data)
+            layout.append((offset, len(data), typecode(column)))
+            offset += len(data)
+    return path, tuple(layout)
+
+
+def _attach_graph(path: str, layout: Tuple):
+    """Worker initializer, maps the graph file and keeps memoryviews over its sections"""
+    global _worker_graph
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else None
+    view = memoryview(mapped) if mapped is not None else memoryview(b"")
+    columns = [view[start:start + size].cast(code) for start, size, code in layout]
+    _worker_graph = (mapped, columns)
+
+
+def _solve_group(group: Tuple[int, Sequence[int]]) -> Tuple[int, List[float]]:
+    """One Dijkstra tree from source, stopped once all of its targets are settled"""
+    source, targets = group
+    offsets, csr_targets, weights = _worker_graph[1]
+    _, distances = csr_dijkstra(offsets, csr_targets, weights, source, targets)
+    return source, [distances[target] for target in targets]
+
+
+def _component_groups(compact: CompactGraph, groups: Dict[int, List[int]]):
+    """
+    Splits off the targets outside the component of their source, they are
+    unreachable. Returns the remaining groups, sources of the largest
+    components first since their trees take longest, and the split off pairs.
+    """
+    labels = component_labels(compact.node_count, compact.edge_starts, compact.edge_ends)
+    sizes = Counter(labels)
+    reachable = {}
+    unreachable = []
+    for source, targets in sorted(groups.items(), key=lambda group: -sizes[labels[group[0]]]):
+        component = labels[source]
+        same = [target for target in targets if labels[target] == component]
+        unreachable.extend((source, target) for target in targets if labels[target] != component)
+        if same:
+            reachable[source] = same
+    return reachable, unreachable
+
+
+def _run_groups(compact: CompactGraph, groups: Dict[int, List[int]], workers: int = None) -> Dict[Tuple[int, int], float]:
+    """Solves every source group, in process for one worker, in a process pool otherwise"""
+    global _worker_graph
+    workers = workers or os.cpu_count() or 1
+    groups, unreachable = _component_groups(compact, groups)
+    results = dict.fromkeys(unreachable, INFINITY)
+    tasks = list(groups.items())
+
+    if workers == 1 or len(tasks) <= 1:
+        _worker_graph = (None, [compact.offsets, compact.targets, compact.weights])
+        try:
+            solved = [_solve_group(task) for task in tasks]
+        finally:
+            _worker_graph = None
+    else:
+        path, layout = _write_graph_file(compact)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_graph, initargs=(path, layout)) as executor:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                solved = list(executor.map(_solve_group, tasks, chunksize=chunksize))
+        finally:
+            os.remove(path)
+
+    for source, distances in solved:
+        for target, distance in zip(groups[source], distances):
+            results[(source, target)] = distance
+    return results
+
+
+def batch_distances(graph, pairs: Iterable[Tuple], workers: int = None) -> List[Optional[float]]:
+    """
+    Distances for a list of (source, target) pairs, None where unreachable.
+
+    graph is a Graph, a CompactGraph or a graph file path. Nodes can be given
+    as node objects, names or ids.
+    """
+    compact = _as_compact(graph)
+    pairs = [(_node_id(compact, source), _node_id(compact, target)) for source, target in pairs]
+
+    # Targets of every source without duplicates, in the order they first appear
+    unique: Dict[int, Dict[int, None]] = {}
+    for source, target in pairs:
+        unique.setdefault(source, {})[target] = None
+    groups = {source: list(targets) for source, targets in unique.items()}
+
+    results = _run_groups(compact, groups, workers)
+    return [None if results[pair] == INFINITY else _plain(compact, results[pair]) for pair in pairs]
+
+
+def distance_matrix(graph, sources: Sequence, targets: Sequence, workers: int = None) -> List[List[Optional[float]]]:
+    """Distances from every source to every target, rows follow sources and columns follow targets"""
+    compact = _as_compact(graph)
+    source_ids = [_node_id(compact, source) for source in sources]
+    target_ids = [_node_id(compact, target) for target in targets]
+
+    groups = {source: list(dict.fromkeys(target_ids)) for source in source_ids}
+    results = _run_groups(compact, groups, workers)
+    return [
+        [None if results[(source, target)] == INFINITY else _plain(compact, results[(source, target)]) for target in target_ids]
+        for source in source_ids
+    ]
+
+
+def _plain(compact: CompactGraph, distance: float):
+    """Integer weighted graphs report integer distances"""
+    return int(distance) if typecode(compact.weights) == 'q' else distance
+
+
+def _read_pairs(path: str) -> List[Tuple[str, str]]:
+    """Reads source,target name pairs from a CSV file, one pair per row"""
+    with open(path, newline='') as f:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("graph", help="graph file written by save_graph")
+    parser.add_argument("--pairs", help="CSV file with source,target node names")
+    parser.add_argument("--sources", nargs="+", help="source node names, combined with --targets")
+    parser.add_argument("--targets", nargs="+", help="target node names, combined with --sources")
+    parser.add_argument("--all", action="store_true", help="distance matrix between all nodes")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--output", help="CSV output file, stdout by default")
+    args = parser.parse_args(argv)
+
+    compact = CompactGraph.from_file(args.graph)
+
+    if args.pairs:
+        pairs = _read_pairs(args.pairs)
+        rows = [(source, target, distance) for (source, target), distance
+                in zip(pairs, batch_distances(compact, pairs, args.workers))]
+    else:
+        if args.all:
+            sources = targets = compact.names
+        elif args.sources and args.targets:
+            sources, targets = args.sources, args.targets
+        else:
+            parser.error("give --pairs, --sources with --targets, or --all")
+        matrix = distance_matrix(compact, sources, targets, args.workers)
+        rows = [(source, target, distance) for source, row in zip(sources, matrix)
+                for target, distance in zip(targets, row)]
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(("source", "target", "distance"))
+        for source, target, distance in rows:
+            writer.writerow((source, target, "" if distance is None else distance))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
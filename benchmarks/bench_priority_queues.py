@@ -0,0 +1,124 @@
+"""
+Benchmark of the priority queues in priority_queues.py.
+
+Runs a full single-source Dijkstra with every queue kind on graphs shaped like
+the ones the editor saves (points on a plane, edges to nearby points, small
+integer weights) and reports pushes/pops per second and the total solve time.
+
+    python -m benchmarks.bench_priority_queues
+    python -m benchmarks.bench_priority_queues --sizes 1000 50000 --graph graph.json
+"""
+import argparse
+import random
+import time
+
+from graph_core import Graph, GraphNode, GraphEdge
+from priority_queues import make_queue, QUEUE_KINDS
+from saving import load_graph
+
+
+def make_editor_like_graph(node_count: int, seed: int = 0, max_weight: int = 40) -> Graph:
+    """
+    Jittered grid of nodes connected to their right, lower and one diagonal
+    neighbour, weights are the scaled euclidean length like in graph.json.
+    """
+    rng = random.Random(seed)
+    side = max(2, int(node_count ** 0.5))
+    spacing = 100
+
+    graph = Graph()
+    grid = []
+    for row in range(side):
+        grid_row = []
+        for column in range(side):
+            node = GraphNode(column * spacing + rng.randint(-30, 30), row * spacing + rng.randint(-30, 30), f"N{row}_{column}")
+            graph.add_node(node)
+            grid_row.append(node)
+        grid.append(grid_row)
+
+    def connect(a: GraphNode, b: GraphNode):
+        edge = GraphEdge(a, b)
+        length = ((a.x - b.x) ** 2 + (a.y - b.y) ** 2) ** 0.5
+        edge.value = max(1, min(max_weight, int(length / 4)))
+        graph.add_edge(edge)
+
+    for row in range(side):
+        for column in range(side):
+            if column + 1 < side:
+                connect(grid[row][column], grid[row][column + 1])
+            if row + 1 < side:
+                connect(grid[row][column], grid[row + 1][column])
+            if row + 1 < side and column + 1 < side and rng.random() < 0.5:
+                connect(grid[row][column], grid[row + 1][column + 1])
+
+    return graph
+
+
+def count_queue_operations(graph: Graph, start: GraphNode, kind: str):
+    """Full Dijkstra from start that counts queue operations, returns (pushes, pops, seconds)"""
+    max_weight = graph.max_edge_weight() if kind == "bucket" else None
+    adjacency = graph.adjacency
+
+    begin = time.perf_counter()
+    queue = make_queue(kind, max_weight)
+    distances = {start: 0}
+    visited = set()
+    queue.push(start, 0)
+    pushes, pops = 1, 0
+
+    while queue:
+        distance, node = queue.pop()
+        pops += 1
+        if node in visited:
+            continue
+        visited.add(node)
+        for neighbor, weight, _ in adjacency[node]:
+            if neighbor in visited:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float("infinity")):
+                distances[neighbor] = new_distance
+                queue.push(neighbor, new_distance)
+                pushes += 1
+
+    return pushes, pops, time.perf_counter() - begin
+
+
+def run(graph: Graph, label: str, repeat: int):
+    start = graph.nodes[0]
+    print(f"\n{label}: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
+    print(f"{'queue':>8} {'pushes':>10} {'pops':>10} {'ops/s':>12} {'solve ms':>10}")
+
+    for kind in QUEUE_KINDS:
+        best = None
+        for _ in range(repeat):
+            pushes, pops, seconds = count_queue_operations(graph, start, kind)
+            best = seconds if best is None else min(best, seconds)
+
+        solve = None
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            graph.dijkstra_algorithm(start, queue=kind, cache=False)
+            elapsed = time.perf_counter() - begin
+            solve = elapsed if solve is None else min(solve, elapsed)
+
+        print(f"{kind:>8} {pushes:>10} {pops:>10} {(pushes + pops) / best:>12.0f} {solve * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="node counts of the generated graphs")
+    parser.add_argument("--graph", help="also benchmark a graph saved by the editor")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per queue, the best time is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.graph:
+        run(load_graph(Graph(), args.graph), args.graph, args.repeat)
+
+    for size in args.sizes:
+        run(make_editor_like_graph(size, args.seed), f"generated {size}", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
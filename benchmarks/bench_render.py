@@ -0,0 +1,75 @@
+"""
+Frame time of draw_game with and without the render cache.
+
+Builds an editor graph with the requested number of nodes laid out on a grid,
+draws it repeatedly and reports the average frame time. Uses SDL's dummy video
+driver unless SDL_VIDEODRIVER is set, so it also runs without a display.
+
+    python -m benchmarks.bench_render --nodes 2000 --frames 120
+"""
+import argparse
+import os
+import random
+import time
+
+if os.environ.setdefault("SDL_VIDEODRIVER", "dummy") == "dummy":
+    # The dummy driver has no monitor to fit the window to
+    os.environ.setdefault("DIJKSTRA_SCREEN_SIZE", "1920,1080")
+
+import dijkstra
+import variables
+import render_cache
+from dijkstra_parts import Node, Edge
+
+
+def make_editor_graph(node_count: int, width: int, height: int, seed: int = 0) -> dijkstra.Graph:
+    """Nodes on a grid that fits the window, each connected to its right and lower neighbour"""
+    rng = random.Random(seed)
+    graph = dijkstra.Graph()
+    columns = max(1, int((node_count * width / height) ** 0.5))
+    rows = (node_count + columns - 1) // columns
+    step_x, step_y = width / (columns + 1), height / (rows + 1)
+
+    for i in range(node_count):
+        row, column = divmod(i, columns)
+        graph.add_node(Node(int((column + 1) * step_x), int((row + 1) * step_y), f"N{i}"))
+
+    for i, node in enumerate(graph.nodes):
+        for neighbor in (i + 1, i + columns):
+            if neighbor < node_count and (neighbor != i + 1 or neighbor % columns):
+                edge = Edge(node, graph.nodes[neighbor])
+                edge.value = rng.randint(1, 40)
+                graph.add_edge(edge)
+
+    return graph
+
+
+def frame_time(graph, frames: int) -> float:
+    """Average seconds per draw_game call"""
+    dijkstra.draw_game(graph)
+    begin = time.perf_counter()
+    for _ in range(frames):
+        dijkstra.draw_game(graph)
+    return (time.perf_counter() - begin) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    graph = make_editor_graph(args.nodes, variables.SCREEN_WIDTH, variables.SCREEN_HEIGHT)
+    print(f"{len(graph.nodes)} nodes, {len(graph.edges)} edges, {args.frames} frames")
+
+    render_cache.CACHE_ENABLED = False
+    uncached = frame_time(graph, args.frames)
+    render_cache.CACHE_ENABLED = True
+    cached = frame_time(graph, args.frames)
+
+    print(f"without cache: {uncached * 1000:.2f} ms/frame")
+    print(f"with cache:    {cached * 1000:.2f} ms/frame ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
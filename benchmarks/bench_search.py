@@ -0,0 +1,65 @@
+"""
+Compares the point-to-point search methods of Graph.find_shortest_path.
+
+Runs the same random (start, end) queries with every method and reports the
+average number of settled nodes and the average query time.
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --sizes 10000 --queries 200 --methods dijkstra bidirectional
+"""
+import argparse
+import random
+import time
+
+from graph_core import SearchStats
+from landmarks import Landmarks
+from contraction import ContractionHierarchy
+from benchmarks.bench_priority_queues import make_editor_like_graph
+
+METHODS = ["dijkstra", "bidirectional", "astar", "alt", "ch"]
+
+
+def run(graph, label: str, methods, queries: int, seed: int):
+    rng = random.Random(seed)
+    pairs = [(rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(queries)]
+
+    print(f"\n{label}: {len(graph.nodes)} nodes, {len(graph.edges)} edges, {queries} queries")
+    print(f"{'method':>14} {'settled/query':>14} {'ms/query':>10}")
+
+    reference = None
+    for method in methods:
+        # Preprocessing is not part of the query time
+        if method == "alt" and graph.landmarks is None:
+            graph.landmarks = Landmarks.build(graph)
+        if method == "ch" and graph.hierarchy is None:
+            graph.hierarchy = ContractionHierarchy.build(graph)
+
+        stats = SearchStats()
+        distances = []
+        begin = time.perf_counter()
+        for start, end in pairs:
+            distances.append(graph.find_shortest_path(start, end, method=method, stats=stats).distance)
+        elapsed = time.perf_counter() - begin
+
+        if reference is None:
+            reference = distances
+        elif distances != reference:
+            print(f"{method:>14} returned different distances than {methods[0]}!")
+
+        print(f"{method:>14} {stats.settled / queries:>14.0f} {elapsed / queries * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="node counts of the generated graphs")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--methods", nargs="+", default=METHODS, choices=METHODS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(make_editor_like_graph(size, args.seed), f"generated {size}", args.methods, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark suite over synthetic graphs from 1k to 10M edges.
+
+For every generator in benchmarks/generators.py and every edge count it times
+solving (Dijkstra on the objects, on the CSR arrays and delta-stepping),
+saving and loading (JSON and the binary format), the hover hit-test of the
+spatial index and rendering a frame off screen. The results are written as
+JSON, and a run can be compared with an earlier one to catch regressions:
+
+    python -m benchmarks.bench_suite --output results.json
+    python -m benchmarks.bench_suite --sizes 1000 10000000 --generators road grid
+    python -m benchmarks.bench_suite --output new.json --baseline results.json
+
+Node objects take a few hundred bytes each, so the benchmarks that need them
+only run up to --max-object-edges, and rendering only up to --max-render-edges.
+Frame rendering needs pygame and uses SDL's dummy video driver unless
+SDL_VIDEODRIVER is set. With --baseline the exit status is 1 when a benchmark
+got slower than the tolerance allows.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import config
+from binary_graph import read_binary, write_binary
+from compact_graph import csr_dijkstra
+from delta_stepping import delta_stepping_arrays
+from saving import load_graph, save_graph
+from spatial_index import SpatialIndex
+from benchmarks.generators import GENERATORS
+
+SIZES = [1000, 10000, 100000, 1000000]
+HOVER_QUERIES = 1000
+RENDER_FRAMES = 5
+
+
+def timed(function, repeat: int = 1) -> float:
+    """Best of repeat runs in seconds"""
+    best = float('infinity')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+
+def bench_compact(compact, results: list, directory: str):
+    """Benchmarks that only need the arrays, they run at every size"""
+    repeat = 3 if compact.edge_count <= 100000 else 1
+    results.append(("solve_csr", timed(lambda: csr_dijkstra(compact.offsets, compact.targets, compact.weights, 0), repeat)))
+    results.append(("solve_delta", timed(lambda: delta_stepping_arrays(compact.offsets, compact.targets, compact.weights, 0), repeat)))
+
+    path = os.path.join(directory, "graph.pgrf")
+    results.append(("save_binary", timed(lambda: write_binary(compact, path))))
+    results.append(("open_binary", timed(lambda: read_binary(path), repeat)))
+
+
+def bench_objects(compact, results: list, directory: str, seed: int):
+    """Benchmarks on the node and edge objects the editor works with"""
+    graph = None
+
+    def build():
+        nonlocal graph
+        graph = compact.to_graph()
+
+    results.append(("build_objects", timed(build)))
+    source = graph.nodes[0]
+    repeat = 3 if compact.edge_count <= 100000 else 1
+    results.append(("solve_dijkstra", timed(lambda: graph.dijkstra_algorithm(source, cache=False), repeat)))
+
+    path = os.path.join(directory, "graph.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        results.append(("save_json", timed(lambda: save_graph(graph, path))))
+    results.append(("load_json", timed(lambda: load_graph(graph.__class__(), path))))
+
+    index = SpatialIndex(graph)
+    right = max(compact.xs)
+    bottom = max(compact.ys)
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, right), rng.uniform(0, bottom)) for _ in range(HOVER_QUERIES)]
+
+    def hover():
+        for point in points:
+            index.nodes_near(point)
+            index.edges_near(point)
+
+    results.append(("hover_hit_test", timed(hover, 3) / HOVER_QUERIES))
+
+
+def bench_render(compact, results: list):
+    """Average time of a full frame and of a hover frame drawn by the Renderer"""
+    import dijkstra
+
+    graph = compact.to_graph(dijkstra.Graph())
+    renderer = dijkstra.get_renderer(graph)
+
+    def full_frame():
+        for _ in range(RENDER_FRAMES):
+            renderer.invalidate()
+            renderer.render()
+
+    results.append(("render_full_frame", timed(full_frame) / RENDER_FRAMES))
+
+    nodes = graph.nodes[:RENDER_FRAMES + 1]
+    renderer.track({nodes[0]})
+    renderer.render()
+
+    def hover_frame():
+        # Only the hovered node changes, the background is reused
+        for node in nodes[1:]:
+            renderer.foreground_nodes = {node}
+            renderer.request_redraw()
+            renderer.render()
+
+    results.append(("render_hover_frame", timed(hover_frame) / RENDER_FRAMES))
+    graph.listeners.remove(renderer)
+
+
+def can_render() -> bool:
+    if os.environ.setdefault("SDL_VIDEODRIVER", "dummy") == "dummy" and config.SCREEN_SIZE is None:
+        # The dummy driver has no monitor to fit the window to
+        config.override(SCREEN_SIZE=(1920, 1080))
+    try:
+        import dijkstra  # noqa: F401
+    except ImportError as error:
+        print(f"Skipping frame rendering: {error}")
+        return False
+    return True
+
+
+def run(generators, sizes, seed: int, max_object_edges: int, max_render_edges: int) -> list:
+    render = max_render_edges > 0 and can_render()
+    records = []
+    for name in generators:
+        for size in sizes:
+            compact = None
+
+            def generate():
+                nonlocal compact
+                compact = GENERATORS[name](size, seed)
+
+            results = [("generate", timed(generate))]
+            with tempfile.TemporaryDirectory(prefix="bench_suite_") as directory:
+                bench_compact(compact, results, directory)
+                if compact.edge_count <= max_object_edges:
+                    bench_objects(compact, results, directory, seed)
+            if render and compact.edge_count <= max_render_edges:
+                bench_render(compact, results)
+
+            print(f"\n{name}: {compact.node_count} nodes, {compact.edge_count} edges")
+            for benchmark, seconds in results:
+                print(f"{benchmark:>20} {seconds * 1000:>12.3f} ms")
+                records.append({
+                    'generator': name,
+                    'size': size,
+                    'nodes': compact.node_count,
+                    'edges': compact.edge_count,
+                    'benchmark': benchmark,
+                    'seconds': seconds,
+                })
+    return records
+
+
+def metadata(seed: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+    }
+
+
+def compare(records: list, baseline_path: str, tolerance: float) -> bool:
+    """Prints the benchmarks that got slower than baseline by more than tolerance, True when there are none"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['generator'], r['size'], r['benchmark']): r['seconds'] for r in json.load(f)['results']}
+
+    regressions = []
+    for record in records:
+        before = baseline.get((record['generator'], record['size'], record['benchmark']))
+        if before and record['seconds'] > before * (1 + tolerance):
+            regressions.append((record, record['seconds'] / before))
+
+    print(f"\n{len(regressions)} regressions against {baseline_path} (tolerance {tolerance:.0%})")
+    for record, ratio in regressions:
+        print(f"  {record['generator']} {record['size']} {record['benchmark']}: {ratio:.2f}x slower")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="target edge counts of the generated graphs")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-object-edges", type=int, default=1000000)
+    parser.add_argument("--max-render-edges", type=int, default=100000, help="0 skips frame rendering")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--baseline", help="results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    records = run(args.generators, args.sizes, args.seed, args.max_object_edges, args.max_render_edges)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(args.seed), 'results': records}, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline and not compare(records, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Seeded synthetic graph generators for the benchmarks.
+
+Every generator takes a target edge count and a seed and returns a
+CompactGraph whose CSR arrays are built with NumPy, so graphs with millions
+of edges are generated without creating node objects. Use
+CompactGraph.to_graph for the object based Graph when a benchmark needs one.
+
+    grid       square lattice, uniform random weights
+    geometric  random points on a plane joined to the points within a radius
+    scale_free Barabasi-Albert preferential attachment, a few huge hubs
+    road       jittered lattice with missing streets and faster arterial roads,
+               weights follow the euclidean length like in the editor
+"""
+import random
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+MAX_WEIGHT = 40
+# Distance between neighbouring lattice points, in editor pixels
+SPACING = 100
+
+
+class NumberedNames(Sequence):
+    """Node names N0, N1, ... made on access instead of storing millions of strings"""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        return f"N{i % self.count}"
+
+
+def _column(values: np.ndarray, code: str) -> array:
+    column = array(code)
+    column.frombytes(np.ascontiguousarray(values, dtype=np.float64 if code == 'd' else np.int64).tobytes())
+    return column
+
+
+def _compact(xs: np.ndarray, ys: np.ndarray, starts: np.ndarray, ends: np.ndarray, weights: np.ndarray) -> CompactGraph:
+    """CompactGraph with the CSR arrays sorted out by NumPy instead of CompactGraph._build_csr"""
+    node_count = len(xs)
+    edge_ids = np.arange(len(starts), dtype=np.int64)
+    sources = np.concatenate((starts, ends))
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+
+    return CompactGraph(
+        names=NumberedNames(node_count),
+        xs=_column(xs, 'd'),
+        ys=_column(ys, 'd'),
+        roots=array('b', bytes(node_count)),
+        edge_starts=_column(starts, 'q'),
+        edge_ends=_column(ends, 'q'),
+        edge_weights=_column(weights, 'q'),
+        csr=(
+            _column(offsets, 'q'),
+            _column(np.concatenate((ends, starts))[order], 'q'),
+            _column(np.concatenate((weights, weights))[order], 'q'),
+            _column(np.concatenate((edge_ids, edge_ids))[order], 'q'),
+        ),
+    )
+
+
+def _lattice(side: int):
+    """Node ids of a side x side lattice and its right and down neighbour pairs"""
+    ids = np.arange(side * side, dtype=np.int64).reshape(side, side)
+    starts = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    ends = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    return ids, starts, ends
+
+
+def grid(edges: int, seed: int = 0) -> CompactGraph:
+    rng = np.random.default_rng(seed)
+    side = max(2, int(round((edges / 2) ** 0.5)))
+    ids, starts, ends = _lattice(side)
+    rows, columns = np.divmod(np.arange(side * side), side)
+    weights = rng.integers(1, MAX_WEIGHT + 1, len(starts))
+    return _compact(columns * SPACING, rows * SPACING, starts, ends, weights)
+
+
+def _length_weights(xs, ys, starts, ends, scale: float = 4.0) -> np.ndarray:
+    lengths = np.hypot(xs[starts] - xs[ends], ys[starts] - ys[ends])
+    return np.clip((lengths / scale).astype(np.int64), 1, MAX_WEIGHT)
+
+
+def geometric(edges: int, seed: int = 0, degree: float = 6.0) -> CompactGraph:
+    """Random points joined to every point within the radius that gives them about degree neighbours"""
+    rng = np.random.default_rng(seed)
+    node_count = max(2, int(2 * edges / degree))
+    side = SPACING * node_count ** 0.5
+    xs = rng.uniform(0, side, node_count)
+    ys = rng.uniform(0, side, node_count)
+    radius = (degree / (np.pi * node_count / side ** 2)) ** 0.5
+
+    # Bucket the points into cells of one radius, then pair each cell with itself and four neighbours.
+    # The extra empty column keeps the down-left neighbour of the first column from wrapping around.
+    columns = (xs // radius).astype(np.int64)
+    rows = (ys // radius).astype(np.int64)
+    width = int(max(columns.max(), rows.max())) + 2
+    cells = rows * width + columns
+    order = np.argsort(cells, kind='stable')
+    sorted_cells = cells[order]
+    cell_starts = np.searchsorted(sorted_cells, np.arange(width * width + 1))
+
+    starts, ends = [], []
+    for offset in (0, 1, width - 1, width, width + 1):
+        neighbours = np.minimum(sorted_cells + offset, width * width - 1)
+        first = cell_starts[neighbours]
+        counts = cell_starts[neighbours + 1] - first
+        total = int(counts.sum())
+        # Every point paired with every point of the neighbouring cell, laid out like delta_stepping._candidates
+        pairs_a = np.repeat(order, counts)
+        slots = np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        pairs_b = order[slots]
+        keep = np.hypot(xs[pairs_a] - xs[pairs_b], ys[pairs_a] - ys[pairs_b]) <= radius
+        if offset == 0:
+            keep &= pairs_a < pairs_b
+        starts.append(pairs_a[keep])
+        ends.append(pairs_b[keep])
+
+    starts = np.concatenate(starts)
+    ends = np.concatenate(ends)
+    return _compact(xs, ys, starts, ends, _length_weights(xs, ys, starts, ends))
+
+
+def scale_free(edges: int, seed: int = 0, attachments: int = 3) -> CompactGraph:
+    """Barabasi-Albert graph, every new node attaches to attachments existing nodes by degree"""
+    rng = random.Random(seed)
+    node_count = max(attachments + 1, edges // attachments + 1)
+
+    # Every edge endpoint once, choosing from it picks a node proportionally to its degree
+    endpoints = list(range(attachments))
+    starts = array('q')
+    ends = array('q')
+    for node in range(attachments, node_count):
+        chosen = set()
+        while len(chosen) < attachments:
+            chosen.add(endpoints[rng.randrange(len(endpoints))])
+        for target in chosen:
+            starts.append(node)
+            ends.append(target)
+            endpoints.append(target)
+            endpoints.append(node)
+
+    generator = np.random.default_rng(seed)
+    side = SPACING * node_count ** 0.5
+    return _compact(generator.uniform(0, side, node_count), generator.uniform(0, side, node_count),
+                    np.frombuffer(starts, dtype=np.int64), np.frombuffer(ends, dtype=np.int64),
+                    generator.integers(1, MAX_WEIGHT + 1, len(starts)))
+
+
+def road(edges: int, seed: int = 0, missing: float = 0.15, arterial_every: int = 8) -> CompactGraph:
+    """
+    Jittered lattice where a share of the streets is missing and every
+    arterial_every-th row and column is an arterial road at half the weight.
+    """
+    rng = np.random.default_rng(seed)
+    side = max(2, int(round((edges / (2 * (1 - missing))) ** 0.5)))
+    ids, starts, ends = _lattice(side)
+    rows, columns = np.divmod(np.arange(side * side), side)
+    xs = columns * SPACING + rng.integers(-30, 31, side * side)
+    ys = rows * SPACING + rng.integers(-30, 31, side * side)
+
+    arterial = (rows[starts] % arterial_every == 0) & (rows[starts] == rows[ends])
+    arterial |= (columns[starts] % arterial_every == 0) & (columns[starts] == columns[ends])
+    keep = arterial | (rng.random(len(starts)) >= missing)
+    starts, ends, arterial = starts[keep], ends[keep], arterial[keep]
+
+    weights = _length_weights(xs, ys, starts, ends)
+    weights[arterial] = np.maximum(1, weights[arterial] // 2)
+    return _compact(xs, ys, starts, ends, weights)
+
+
+GENERATORS = {
+    "grid": grid,
+    "geometric": geometric,
+    "scale_free": scale_free,
+    "road": road,
+}
@@ -0,0 +1,158 @@
+"""
+Versioned binary graph file format, opened with mmap.
+
+Layout (little endian):
+
+    header    magic b"PGRF", version u16, flags u16, node count u64, edge count u64
+    sections  one (offset u64, size u64) entry per section in SECTIONS order
+    data      the sections, each starting at a multiple of 8 bytes
+
+The sections are the columns of a CompactGraph: node coordinates and root
+flags, a string table with the node names (name_offsets indexes into names),
+the edge list in its original order and the CSR arrays built from it. Since
+the CSR arrays are stored, read_binary only maps the file and casts
+memoryviews over it; nothing is parsed or copied until it is used.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from typing import Sequence
+
+from compact_graph import CompactGraph, typecode
+
+MAGIC = b"PGRF"
+VERSION = 1
+BINARY_EXTENSION = ".pgrf"
+
+# Header flag: edge weights are doubles instead of 64 bit integers
+FLOAT_WEIGHTS = 1
+
+HEADER = struct.Struct("<4sHHQQ")
+SECTION = struct.Struct("<QQ")
+ALIGNMENT = 8
+
+# (name, typecode) of every section, 'w' is the weight type given by the header flags
+SECTIONS = (
+    ("xs", 'd'),
+    ("ys", 'd'),
+    ("roots", 'b'),
+    ("name_offsets", 'q'),
+    ("names", 'B'),
+    ("edge_starts", 'q'),
+    ("edge_ends", 'q'),
+    ("edge_weights", 'w'),
+    ("offsets", 'q'),
+    ("targets", 'q'),
+    ("weights", 'w'),
+    ("edge_ids", 'q'),
+)
+
+if sys.byteorder != "little":
+    raise ImportError("binary_graph only supports little endian machines")
+
+
+class StringTable(Sequence):
+    """Node names decoded on access from a block of UTF-8 bytes and their offsets"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+def is_binary(path: str) -> bool:
+    """True when the file at path starts with the binary format's magic bytes"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _string_table(names) -> tuple:
+    offsets = array('q', [0])
+    data = bytearray()
+    for name in names:
+        data += name.encode('utf-8')
+        offsets.append(len(data))
+    return offsets, data
+
+
+def write_binary(compact: CompactGraph, path: str):
+    """Writes a CompactGraph, including its CSR arrays, to path"""
+    weight_code = typecode(compact.edge_weights)
+    name_offsets, names = _string_table(compact.names)
+    columns = {
+        "xs": compact.xs, "ys": compact.ys, "roots": compact.roots,
+        "name_offsets": name_offsets, "names": names,
+        "edge_starts": compact.edge_starts, "edge_ends": compact.edge_ends, "edge_weights": compact.edge_weights,
+        "offsets": compact.offsets, "targets": compact.targets, "weights": compact.weights, "edge_ids": compact.edge_ids,
+    }
+
+    blobs = [bytes(columns[name]) if code == 'B' else columns[name].tobytes() for name, code in SECTIONS]
+
+    table = []
+    position = HEADER.size + SECTION.size * len(SECTIONS)
+    for blob in blobs:
+        position += -position % ALIGNMENT
+        table.append((position, len(blob)))
+        position += len(blob)
+
+    flags = FLOAT_WEIGHTS if weight_code == 'd' else 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, compact.node_count, compact.edge_count))
+        for offset, size in table:
+            f.write(SECTION.pack(offset, size))
+        for (offset, _), blob in zip(table, blobs):
+            f.write(bytes(offset - f.tell()))
+            f.write(blob)
+
+
+def read_binary(path: str) -> CompactGraph:
+    """Maps a file written by write_binary, every column of the result is a view into the file"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < HEADER.size:
+        raise ValueError(f"{path} is not a binary graph file")
+    magic, version, flags, node_count, edge_count = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary graph file")
+    if version != VERSION:
+        raise ValueError(f"{path} has binary graph format version {version}, only version {VERSION} is supported")
+
+    weight_code = 'd' if flags & FLOAT_WEIGHTS else 'q'
+    view = memoryview(mapped)
+    columns = {}
+    for i, (name, code) in enumerate(SECTIONS):
+        offset, size = SECTION.unpack_from(mapped, HEADER.size + i * SECTION.size)
+        if offset + size > len(mapped):
+            raise ValueError(f"{path} is truncated")
+        columns[name] = view[offset:offset + size].cast(weight_code if code == 'w' else code)
+
+    if len(columns["xs"]) != node_count or len(columns["edge_starts"]) != edge_count:
+        raise ValueError(f"{path} is corrupt, section sizes do not match the header")
+
+    compact = CompactGraph(
+        names=StringTable(columns["name_offsets"], columns["names"]),
+        xs=columns["xs"],
+        ys=columns["ys"],
+        roots=columns["roots"],
+        edge_starts=columns["edge_starts"],
+        edge_ends=columns["edge_ends"],
+        edge_weights=columns["edge_weights"],
+        csr=(columns["offsets"], columns["targets"], columns["weights"], columns["edge_ids"]),
+    )
+    # The views keep the mapping alive, this reference just makes it visible
+    compact.mapping = mapped
+    return compact
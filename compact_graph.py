@@ -0,0 +1,258 @@
+"""
+Compact array backed graph storage.
+
+Nodes are integer ids 0..n-1 and the undirected edges are stored in
+compressed sparse row (CSR) form: the neighbours of node i are
+targets[offsets[i]:offsets[i + 1]] with the matching weights. Every edge is
+stored in both directions and edge_ids maps each CSR slot back to the index
+of the edge in the original edge list. All columns are flat array.array
+buffers, so a graph with millions of edges never creates per-node objects.
+"""
+import json
+from array import array
+from heapq import heappush, heappop
+from typing import Dict, List, Tuple
+
+INFINITY = float('infinity')
+
+
+def typecode(column) -> str:
+    """Element type of an array.array or of a memoryview cast from a mapped file"""
+    return getattr(column, 'typecode', None) or column.format
+
+
+def _weight_array(weights) -> array:
+    """Integer weights are stored as 'q', anything else as 'd'"""
+    weights = list(weights) if not isinstance(weights, array) else weights
+    if all(isinstance(weight, int) for weight in weights):
+        return array('q', weights)
+    return array('d', weights)
+
+
+class CompactGraph:
+    def __init__(self, names: List[str], xs: array, ys: array, roots: array,
+                 edge_starts: array, edge_ends: array, edge_weights: array, csr: Tuple = None):
+        self.names = names
+        self.xs = xs
+        self.ys = ys
+        self.roots = roots
+
+        # Edge list in the original order, used to convert back and to map paths to edges
+        self.edge_starts = edge_starts
+        self.edge_ends = edge_ends
+        self.edge_weights = edge_weights
+
+        # csr = (offsets, targets, weights, edge_ids) when they were stored with the graph
+        self.offsets, self.targets, self.weights, self.edge_ids = csr if csr is not None else self._build_csr()
+        self._index = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_starts)
+
+    def _build_csr(self):
+        """Counting sort of the edge list into CSR arrays, both directions per edge"""
+        node_count = len(self.names)
+        edge_count = len(self.edge_starts)
+
+        offsets = array('q', bytes(8 * (node_count + 1)))
+        for start, end in zip(self.edge_starts, self.edge_ends):
+            offsets[start + 1] += 1
+            offsets[end + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        slots = 2 * edge_count
+        targets = array('q', bytes(8 * slots))
+        weights = array(typecode(self.edge_weights), bytes(self.edge_weights.itemsize * slots))
+        edge_ids = array('q', bytes(8 * slots))
+
+        cursor = array('q', offsets[:-1]) if node_count else array('q')
+        for edge_id in range(edge_count):
+            start = self.edge_starts[edge_id]
+            end = self.edge_ends[edge_id]
+            weight = self.edge_weights[edge_id]
+            for source, target in ((start, end), (end, start)):
+                slot = cursor[source]
+                targets[slot] = target
+                weights[slot] = weight
+                edge_ids[slot] = edge_id
+                cursor[source] = slot + 1
+
+        return offsets, targets, weights, edge_ids
+
+    @classmethod
+    def from_graph(cls, graph) -> "CompactGraph":
+        """Builds a compact copy of a Graph, node ids follow graph.nodes"""
+        ids = {node: i for i, node in enumerate(graph.nodes)}
+        return cls(
+            names=[node.name for node in graph.nodes],
+            xs=array('d', (node.x for node in graph.nodes)),
+            ys=array('d', (node.y for node in graph.nodes)),
+            roots=array('b', (bool(node.root) for node in graph.nodes)),
+            edge_starts=array('q', (ids[edge.start] for edge in graph.edges)),
+            edge_ends=array('q', (ids[edge.end] for edge in graph.edges)),
+            edge_weights=_weight_array(edge.value for edge in graph.edges),
+        )
+
+    @classmethod
+    def from_dict(cls, graph_data: dict) -> "CompactGraph":
+        """Builds a compact graph from the dictionary written by save_graph"""
+        nodes = graph_data['nodes']
+        ids = {node_data['name']: i for i, node_data in enumerate(nodes)}
+        return cls(
+            names=[node_data['name'] for node_data in nodes],
+            xs=array('d', (node_data['x'] for node_data in nodes)),
+            ys=array('d', (node_data['y'] for node_data in nodes)),
+            roots=array('b', (bool(node_data.get('root', False)) for node_data in nodes)),
+            edge_starts=array('q', (ids[edge_data['start']] for edge_data in graph_data['edges'])),
+            edge_ends=array('q', (ids[edge_data['end']] for edge_data in graph_data['edges'])),
+            edge_weights=_weight_array(edge_data.get('value', 1) for edge_data in graph_data['edges']),
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompactGraph":
+        """Reads a graph file written by save_graph, binary files are memory-mapped (see binary_graph.py)"""
+        from binary_graph import is_binary, read_binary
+        if is_binary(path):
+            return read_binary(path)
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        """Converts to the dictionary format used by save_graph"""
+        names = self.names
+        return {
+            'nodes': list(self._node_dicts()),
+            'edges': [
+                {'start': names[start], 'end': names[end], 'value': weight}
+                for start, end, weight in zip(self.edge_starts, self.edge_ends, self.edge_weights)
+            ],
+        }
+
+    def _node_dicts(self):
+        """Yields the node dictionaries of to_dict"""
+        for name, x, y, root in zip(self.names, self.xs, self.ys, self.roots):
+            yield {
+                'x': int(x) if x.is_integer() else x,
+                'y': int(y) if y.is_integer() else y,
+                'name': name,
+                'root': bool(root),
+                'value': 0,
+            }
+
+    def to_graph(self, graph=None):
+        """Builds Node/Edge objects into graph (a new core Graph by default)"""
+        if graph is None:
+            from graph_core import Graph
+            graph = Graph()
+        graph.clear()
+
+        nodes = []
+        for node_data in self._node_dicts():
+            node = graph.node_class.from_dict(node_data)
+            graph.add_node(node)
+            nodes.append(node)
+
+        for start, end, weight in zip(self.edge_starts, self.edge_ends, self.edge_weights):
+            edge = graph.edge_class(nodes[start], nodes[end])
+            edge.value = weight
+            graph.add_edge(edge)
+
+        return graph
+
+    def index_of(self, name: str) -> int:
+        """Returns the node id of a node name"""
+        if self._index is None:
+            self._index = {node_name: i for i, node_name in enumerate(self.names)}
+        return self._index[name]
+
+    def neighbors(self, node: int):
+        """Yields (neighbor, weight) pairs of a node id"""
+        for slot in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.targets[slot], self.weights[slot]
+
+    def dijkstra(self, source: int, target: int = -1) -> Tuple[array, array]:
+        """
+        Dijkstra on the CSR arrays.
+
+        Returns (previous, distances) indexed by node id, previous is -1 for
+        the source and for unreached nodes. Stops once target is settled.
+        """
+        return csr_dijkstra(self.offsets, self.targets, self.weights, source, (target,) if target >= 0 else ())
+
+    def shortest_path(self, source: int, target: int) -> Tuple[List[int], float]:
+        """Returns (node ids of the path, distance), ([], None) when unreachable"""
+        previous, distances = self.dijkstra(source, target)
+        if distances[target] == INFINITY:
+            return [], None
+
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        path.reverse()
+
+        distance = distances[target]
+        return path, int(distance) if typecode(self.weights) == 'q' else distance
+
+    def path_edges(self, path: List[int]) -> List[int]:
+        """Maps a node id path to the ids of the lightest edges along it"""
+        edges = []
+        for node, next_node in zip(path, path[1:]):
+            best = None
+            for slot in range(self.offsets[node], self.offsets[node + 1]):
+                if self.targets[slot] == next_node and (best is None or self.weights[slot] < self.weights[best]):
+                    best = slot
+            edges.append(self.edge_ids[best])
+        return edges
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes used by each array column"""
+        columns = ('xs', 'ys', 'roots', 'edge_starts', 'edge_ends', 'edge_weights',
+                   'offsets', 'targets', 'weights', 'edge_ids')
+        return {column: len(getattr(self, column)) * getattr(self, column).itemsize for column in columns}
+
+
+def csr_dijkstra(offsets, targets, weights, source: int, stop_at=()) -> Tuple[array, array]:
+    """
+    Dijkstra over any indexable CSR buffers (arrays, memoryviews of shared memory).
+
+    Stops once every node id in stop_at is settled, or explores the whole
+    component when stop_at is empty. Returns (previous, distances).
+    """
+    node_count = len(offsets) - 1
+
+    distances = array('d', [INFINITY]) * node_count
+    previous = array('q', [-1]) * node_count
+    settled = bytearray(node_count)
+    remaining = set(stop_at)
+
+    distances[source] = 0
+    heap = [(0, source)]
+
+    while heap:
+        distance, node = heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+
+        if remaining:
+            remaining.discard(node)
+            if not remaining:
+                break
+
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[slot]
+            if settled[neighbor]:
+                continue
+            new_distance = distance + weights[slot]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = node
+                heappush(heap, (new_distance, neighbor))
+
+    return previous, distances
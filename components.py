@@ -0,0 +1,101 @@
+"""
+Connected components with union-find.
+
+DisjointSet keeps the components of the nodes of a Graph. Adding an edge
+merges two components in O(alpha(n)), so Graph updates it on every add_edge;
+a union cannot be undone, so deletions only mark it stale and it is rebuilt
+from scratch on the next query. Two nodes in different components have no
+path between them, which lets the solvers reject such queries at once.
+
+component_labels does the same for the arrays of a CompactGraph.
+"""
+from array import array
+from typing import Dict, Hashable
+
+
+class DisjointSet:
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+        # Element count of each set, only kept for the roots
+        self.sizes: Dict[Hashable, int] = {}
+        self.count = 0
+
+    @classmethod
+    def from_graph(cls, graph) -> "DisjointSet":
+        components = cls()
+        for node in graph.nodes:
+            components.add(node)
+        for edge in graph.edges:
+            components.union(edge.start, edge.end)
+        return components
+
+    def add(self, element):
+        if element not in self.parent:
+            self.parent[element] = element
+            self.sizes[element] = 1
+            self.count += 1
+
+    def find(self, element):
+        """Root of the set of element, unknown elements are added as a set of their own"""
+        parent = self.parent
+        if element not in parent:
+            self.add(element)
+            return element
+        # Path halving, every other node on the way up skips to its grandparent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, a, b) -> bool:
+        """Merges the sets of a and b, returns False when they already were one"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.sizes[a] += self.sizes.pop(b)
+        self.count -= 1
+        return True
+
+    def connected(self, a, b) -> bool:
+        return self.find(a) == self.find(b)
+
+    def size(self, element) -> int:
+        """Number of elements in the set of element"""
+        return self.sizes[self.find(element)]
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __repr__(self):
+        return f"DisjointSet({len(self.parent)} elements, {self.count} sets)"
+
+
+def component_labels(node_count: int, edge_starts, edge_ends) -> array:
+    """
+    Component of every node id of an edge list (e.g. CompactGraph.edge_starts/edge_ends).
+    Labels are the smallest node id of each component.
+    """
+    parent = array('q', range(node_count))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for start, end in zip(edge_starts, edge_ends):
+        a, b = find(start), find(end)
+        if a != b:
+            # Linking the larger root below the smaller one keeps the smallest id as the label
+            if a < b:
+                parent[b] = a
+            else:
+                parent[a] = b
+
+    # Parents always have smaller ids, so in id order every parent already carries its final label
+    for node in range(node_count):
+        parent[node] = parent[parent[node]]
+    return parent
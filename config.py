@@ -0,0 +1,104 @@
+# Plain configuration constants. This module must not import pygame so that
+# the solver core (graph_core.py, saving.py) can be used without a display.
+# Every constant can be overridden by an environment variable named
+# DIJKSTRA_<NAME>, e.g. DIJKSTRA_SAVE_PATH=city.json or DIJKSTRA_MAX_FPS=30.
+# override() changes them at run time, but modules that copied them with
+# `from config import *` keep the old values. The paths, SOLVER_METHOD,
+# MAX_FPS, AUTOSAVE, the PROFILE settings and SCREEN_SIZE (until the window
+# is opened) are read as config.<NAME> when used, so override() reaches them.
+import os
+
+# DEFINITIONS of time
+# Default time between two animated solver steps and how long the result stays on screen, in ms
+NEXT_NODE_WAIT_TIME = 300
+END_GAME_WAIT_TIME = 5000
+# Time the solver animation may use per frame, in ms, so skipping to the end never freezes the window
+STEP_TIME_BUDGET = 8
+# Bounds of the step interval when the speed is changed with + and -
+MIN_STEP_TIME = 5
+MAX_STEP_TIME = 5000
+
+
+# DEFINITIONS of paths
+SAVE_PATH = "graph_3.json"
+LOAD_PATH = "graph_2.json"
+# Disk cache of all-pairs distance matrices, see all_pairs.py
+APSP_CACHE_DIR = "apsp_cache"
+# Journal every edit next to SAVE_PATH and restore the last session on start, see journal.py
+AUTOSAVE = True
+
+# DEFINIONS of colors
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+LIGHT_GRAY = (200, 200, 200)
+DARK_GRAY = (100, 100, 100)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+
+# DEFINITIONS of sizes
+NODE_RADIUS = 30
+BORDER_WIDTH = 3
+# Monitor size the window is fitted to as (width, height), None asks the first monitor
+SCREEN_SIZE = None
+
+
+# DEFINITIONS of edges
+EDGE_THICKNESS = 5
+
+RADIUS_INWARD = 1
+TOLERANCE = 0.12
+
+# DEFINITIONS of fonts
+FONT_SIZE = 10
+
+# DEFINITIONS of FPS
+MAX_FPS = 60
+
+# DEFINITIONS of the solver, "dijkstra", "bidirectional", "astar", "alt", "ch", "dynamic", "apsp" or "delta"
+# "dynamic" keeps the shortest path tree of the start node and repairs it after edits
+SOLVER_METHOD = "dynamic"
+
+# DEFINITIONS of instrumentation, see instrumentation.py
+# Time the editor loop and count the solver's work from the start, 'i' toggles it while running
+PROFILE = False
+# Show the timings next to the score, refreshed every PROFILE_OVERLAY_REFRESH ms
+PROFILE_OVERLAY = True
+PROFILE_OVERLAY_REFRESH = 250
+# Chrome trace written when instrumentation is stopped or the editor quits
+PROFILE_TRACE_PATH = "profile_trace.json"
+
+
+# Overrides
+ENV_PREFIX = "DIJKSTRA_"
+
+
+def parse_value(text: str, current):
+    """Converts text to the type of the current value of a constant"""
+    if isinstance(current, bool):
+        return text.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(current, (int, float)):
+        return type(current)(text)
+    if isinstance(current, tuple) or (current is None and "," in text):
+        return tuple(int(part) for part in text.split(","))
+    return text
+
+
+def override(**values) -> dict:
+    """
+    Sets constants of this module, strings are converted to the type of the current value. Returns the new values.
+    Only code reading config.<NAME> sees the change, see the top of this file.
+    """
+    converted = {}
+    for name, value in values.items():
+        if not name.isupper() or name not in globals():
+            raise KeyError(f"Unknown setting {name}")
+        current = globals()[name]
+        converted[name] = parse_value(value, current) if isinstance(value, str) and not isinstance(current, str) else value
+    globals().update(converted)
+    return converted
+
+
+override(**{name[len(ENV_PREFIX):]: value for name, value in os.environ.items()
+            if name.startswith(ENV_PREFIX) and name[len(ENV_PREFIX):].isupper() and name[len(ENV_PREFIX):] in globals()})
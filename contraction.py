@@ -0,0 +1,252 @@
+"""
+Contraction Hierarchies for fast repeated point-to-point queries.
+
+Preprocessing contracts the nodes one by one in order of importance. When a
+node is removed, a shortcut edge is added between two of its neighbours
+whenever the path through the node is the only shortest path between them.
+A query is then a bidirectional Dijkstra that only follows edges leading to
+more important nodes, which settles a few hundred nodes even on large graphs.
+Shortcuts remember the contracted middle node so they can be unpacked back
+into the original edges.
+"""
+from heapq import heapify, heappush, heappop
+from typing import Dict, List, Tuple
+
+from graph_core import PathResult, SearchStats
+
+INFINITY = float('infinity')
+
+# Settled node limit of a witness search, a missed witness only adds a superfluous shortcut
+WITNESS_SETTLE_LIMIT = 60
+
+
+class ContractionHierarchy:
+    def __init__(self, nodes: List, edges: List, rank: List[int],
+                 up: List[Dict[int, Tuple[int, int]]], fingerprint: str = None):
+        self.nodes = nodes
+        self.edges = edges
+        self.rank = rank
+        # node id -> {more important neighbour id: (weight, via)}
+        # via >= 0 is the index of an original edge, via < 0 is a shortcut over node -via - 1
+        self.up = up
+        # Graph.content_hash() of the graph the hierarchy was built for
+        self.fingerprint = fingerprint
+        self._ids = {node: i for i, node in enumerate(nodes)}
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for edges in self.up for _, via in edges.values() if via < 0)
+
+    @classmethod
+    def build(cls, graph, witness_limit: int = WITNESS_SETTLE_LIMIT) -> "ContractionHierarchy":
+        """Contracts every node of graph, ordered lazily by edge difference plus contracted neighbours"""
+        nodes = list(graph.nodes)
+        edges = list(graph.edges)
+        ids = {node: i for i, node in enumerate(nodes)}
+
+        # Remaining graph, only the lightest of parallel edges is kept
+        adjacency: List[Dict[int, Tuple[int, int]]] = [{} for _ in nodes]
+        for edge_id, edge in enumerate(edges):
+            a, b = ids[edge.start], ids[edge.end]
+            if a == b:
+                continue
+            if b not in adjacency[a] or edge.value < adjacency[a][b][0]:
+                adjacency[a][b] = (edge.value, edge_id)
+                adjacency[b][a] = (edge.value, edge_id)
+
+        rank = [-1] * len(nodes)
+        up: List[Dict[int, Tuple[int, int]]] = [{} for _ in nodes]
+        contracted_neighbors = [0] * len(nodes)
+
+        def shortcuts_for(node: int):
+            """Shortcuts (u, w, weight) needed when node is removed from the remaining graph"""
+            neighbors = list(adjacency[node].items())
+            shortcuts = []
+            for i, (source, (source_weight, _)) in enumerate(neighbors[:-1]):
+                targets = neighbors[i + 1:]
+                limit = source_weight + max(weight for _, (weight, _) in targets)
+                witness = _witness_search(adjacency, source, node, {target for target, _ in targets}, limit, witness_limit)
+                for target, (target_weight, _) in targets:
+                    through_node = source_weight + target_weight
+                    if witness.get(target, INFINITY) > through_node:
+                        shortcuts.append((source, target, through_node))
+            return shortcuts
+
+        def priority(node: int, shortcuts) -> int:
+            return len(shortcuts) - len(adjacency[node]) + contracted_neighbors[node]
+
+        heap = [(priority(node, shortcuts_for(node)), node) for node in range(len(nodes))]
+        heapify(heap)
+        order = 0
+
+        while heap:
+            _, node = heappop(heap)
+            if rank[node] >= 0:
+                continue
+
+            # Lazy update, the priority may have grown since it was pushed
+            shortcuts = shortcuts_for(node)
+            current = priority(node, shortcuts)
+            if heap and current > heap[0][0]:
+                heappush(heap, (current, node))
+                continue
+
+            rank[node] = order
+            order += 1
+
+            up[node] = adjacency[node]
+            adjacency[node] = {}
+            for neighbor in up[node]:
+                del adjacency[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+
+            for source, target, weight in shortcuts:
+                if target not in adjacency[source] or weight < adjacency[source][target][0]:
+                    adjacency[source][target] = (weight, -node - 1)
+                    adjacency[target][source] = (weight, -node - 1)
+
+        return cls(nodes, edges, rank, up, graph.content_hash())
+
+    def query(self, start, end, stats: SearchStats = None) -> PathResult:
+        """Shortest path between two nodes of the graph, shortcuts unpacked into real edges"""
+        source, target = self._ids[start], self._ids[end]
+        distance, meeting, previous = self._search(source, target, stats)
+        if meeting is None:
+            return PathResult([], [], None)
+
+        # (from, to, via) segments from source to target
+        segments = []
+        node = meeting
+        while previous[0][node] is not None:
+            parent, via = previous[0][node]
+            segments.append((parent, node, via))
+            node = parent
+        segments.reverse()
+
+        node = meeting
+        while previous[1][node] is not None:
+            parent, via = previous[1][node]
+            segments.append((node, parent, via))
+            node = parent
+
+        path = [source]
+        edge_ids = []
+        for segment in segments:
+            self._unpack(segment, path, edge_ids)
+
+        return PathResult([self.nodes[i] for i in path], [self.edges[i] for i in edge_ids], distance)
+
+    def distance(self, start, end, stats: SearchStats = None):
+        """Length of the shortest path between two nodes, None when unreachable"""
+        distance, meeting, _ = self._search(self._ids[start], self._ids[end], stats)
+        return distance if meeting is not None else None
+
+    def _search(self, source: int, target: int, stats: SearchStats):
+        """Bidirectional upward Dijkstra, returns (distance, meeting node, previous maps)"""
+        up = self.up
+        distances = ({source: 0}, {target: 0})
+        previous = ({source: None}, {target: None})
+        heaps = ([(0, source)], [(0, target)])
+        best = INFINITY
+        meeting = None
+        if stats is not None:
+            stats.pushes += 2
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                distance, node = heappop(heap)
+                if stats is not None:
+                    stats.pops += 1
+                own = distances[side]
+                if distance > own[node]:
+                    if stats is not None:
+                        stats.stale_pops += 1
+                    continue
+                # Nothing left on this side can improve the best path
+                if distance >= best:
+                    heap.clear()
+                    continue
+                if stats is not None:
+                    stats.settled += 1
+
+                other_distance = distances[1 - side].get(node)
+                if other_distance is not None and distance + other_distance < best:
+                    best = distance + other_distance
+                    meeting = node
+
+                for neighbor, (weight, via) in up[node].items():
+                    new_distance = distance + weight
+                    if new_distance < own.get(neighbor, INFINITY):
+                        own[neighbor] = new_distance
+                        previous[side][neighbor] = (node, via)
+                        heappush(heap, (new_distance, neighbor))
+                        if stats is not None:
+                            stats.relaxed += 1
+                            stats.pushes += 1
+
+        return best, meeting, previous
+
+    def _unpack(self, segment: Tuple[int, int, int], path: List[int], edge_ids: List[int]):
+        """Expands a (from, to, via) segment into original edges, appending to path and edge_ids"""
+        stack = [segment]
+        while stack:
+            start, end, via = stack.pop()
+            if via >= 0:
+                path.append(end)
+                edge_ids.append(via)
+                continue
+            middle = -via - 1
+            # The middle node was contracted first, both halves are its upward edges
+            stack.append((middle, end, self.up[middle][end][1]))
+            stack.append((start, middle, self.up[middle][start][1]))
+
+    def to_dict(self) -> dict:
+        """JSON friendly form, node ids follow the order of graph.nodes"""
+        return {
+            'fingerprint': self.fingerprint,
+            'names': [node.name for node in self.nodes],
+            'rank': self.rank,
+            'up': [[[neighbor, weight, via] for neighbor, (weight, via) in edges.items()] for edges in self.up],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, graph) -> "ContractionHierarchy":
+        """Rebuilds a hierarchy for graph, which must be the graph it was built for"""
+        if [node.name for node in graph.nodes] != data['names']:
+            raise ValueError("The contraction hierarchy was built for a different graph!")
+        up = [{neighbor: (weight, via) for neighbor, weight, via in edges} for edges in data['up']]
+        return cls(list(graph.nodes), list(graph.edges), data['rank'], up, data.get('fingerprint'))
+
+
+def _witness_search(adjacency, source: int, skipped: int, targets: set, limit: float,
+                    settle_limit: int) -> Dict[int, float]:
+    """
+    Dijkstra from source in the remaining graph without skipped. Stops once all
+    targets are settled, past limit or after settle_limit settled nodes.
+    """
+    distances = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    remaining = len(targets)
+
+    while heap and settled < settle_limit and remaining:
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        if distance > limit:
+            break
+        settled += 1
+        if node in targets:
+            remaining -= 1
+        for neighbor, (weight, _) in adjacency[node].items():
+            if neighbor == skipped:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, INFINITY):
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+
+    return distances
@@ -0,0 +1,209 @@
+"""
+Delta-stepping single-source shortest paths on CSR arrays with NumPy.
+
+Tentative distances are grouped into buckets of width delta. The lowest
+non-empty bucket is emptied by relaxing the light edges (weight <= delta)
+of all of its nodes at once, repeating while that puts nodes back into the
+bucket, and then relaxing the heavy edges of everything it settled once.
+Every relaxation round is a handful of vectorized NumPy operations over the
+whole frontier instead of one heap operation per edge.
+
+With workers > 1 the light edge relaxation of large frontiers is split over
+worker processes. As in batch.py, the arrays they read live in a temporary
+memory-mapped file; the distance array is mapped writable by this process,
+so the workers always see the current distances without any copying.
+"""
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# Frontiers smaller than this are relaxed in process, the worker round trip would cost more
+PARALLEL_MIN_FRONTIER = 1 << 16
+
+# (offsets, targets, weights) of a CSR edge set
+CSR = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Light edges and distances mapped by a worker process, set by _attach
+_worker_arrays = None
+
+
+def default_delta(weights: np.ndarray) -> float:
+    """Mean edge weight, a bucket then holds about one hop"""
+    positive = weights[weights > 0]
+    return float(positive.mean()) if len(positive) else 1.0
+
+
+def split_edges(offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray, delta: float) -> Tuple[CSR, CSR]:
+    """Splits a CSR edge set into its light (weight <= delta) and heavy edges"""
+    sources = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    parts = []
+    for mask in (weights <= delta, weights > delta):
+        part_offsets = np.zeros(len(offsets), dtype=np.int64)
+        np.cumsum(np.bincount(sources[mask], minlength=len(offsets) - 1), out=part_offsets[1:])
+        parts.append((part_offsets, targets[mask], weights[mask]))
+    return parts[0], parts[1]
+
+
+def _candidates(csr: CSR, nodes: np.ndarray, distances: np.ndarray):
+    """(target, distance, source) of every edge out of nodes that improves its target"""
+    offsets, targets, weights = csr
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty(0), empty
+
+    sources = np.repeat(nodes, counts)
+    # Slot of every edge: the start of its node's range plus its position within the range
+    slots = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+    edge_targets = targets[slots]
+    new_distances = distances[sources] + weights[slots]
+
+    better = new_distances < distances[edge_targets]
+    return edge_targets[better], new_distances[better], sources[better]
+
+
+def _apply(distances: np.ndarray, previous: np.ndarray, targets: np.ndarray, new_distances: np.ndarray,
+           sources: np.ndarray) -> np.ndarray:
+    """Writes the best candidate of every target, returns the improved nodes"""
+    if len(targets) == 0:
+        return targets
+    order = np.lexsort((new_distances, targets))
+    targets, new_distances, sources = targets[order], new_distances[order], sources[order]
+    first = np.ones(len(targets), dtype=bool)
+    first[1:] = targets[1:] != targets[:-1]
+    targets, new_distances, sources = targets[first], new_distances[first], sources[first]
+
+    better = new_distances < distances[targets]
+    targets = targets[better]
+    distances[targets] = new_distances[better]
+    previous[targets] = sources[better]
+    return targets
+
+
+def _attach(path: str, layout: Tuple):
+    """Worker initializer, maps the light edges and the distances"""
+    global _worker_arrays
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = [np.frombuffer(mapped, dtype=dtype, count=count, offset=offset) for offset, count, dtype in layout]
+    _worker_arrays = (mapped, arrays)
+
+
+def _worker_candidates(nodes: np.ndarray):
+    offsets, targets, weights, distances = _worker_arrays[1]
+    return _candidates((offsets, targets, weights), nodes, distances)
+
+
+class _LightEdgePool:
+    """Worker processes that relax light edges, sharing the arrays through a mapped file"""
+
+    def __init__(self, light: CSR, node_count: int, workers: int):
+        self.workers = workers
+        columns = [*light, np.full(node_count, np.inf)]
+        layout = []
+        offset = 0
+        fd, self.path = tempfile.mkstemp(prefix="delta_stepping_", suffix=".bin")
+        with os.fdopen(fd, 'wb') as f:
+            for column in columns:
+                offset += -offset % 8
+                f.seek(offset)
+                f.write(column.tobytes())
+                layout.append((offset, len(column), column.dtype.str))
+                offset += column.nbytes
+            f.truncate(max(offset, 1))
+
+        distance_offset = layout[-1][0]
+        self.distances = np.memmap(self.path, dtype=np.float64, mode='r+', offset=distance_offset, shape=(node_count,))
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(self.path, tuple(layout)))
+
+    def candidates(self, nodes: np.ndarray):
+        # The distances are a shared mapping, the workers read the current values directly
+        chunks = np.array_split(nodes, self.workers)
+        results = list(self.executor.map(_worker_candidates, chunks))
+        return tuple(np.concatenate([result[i] for result in results]) for i in range(3))
+
+    def close(self):
+        self.executor.shutdown()
+        del self.distances
+        os.remove(self.path)
+
+
+def delta_stepping_arrays(offsets, targets, weights, source: int, delta: float = None,
+                          workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Delta-stepping on CSR buffers (arrays, memoryviews or ndarrays), weights must be non-negative.
+    Returns (previous, distances) indexed by node id, previous is -1 for the source and unreached nodes.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    node_count = len(offsets) - 1
+    if delta is None:
+        delta = default_delta(weights)
+    light, heavy = split_edges(offsets, targets, weights, delta)
+
+    pool = _LightEdgePool(light, node_count, workers) if workers > 1 and len(targets) >= PARALLEL_MIN_FRONTIER else None
+    distances = pool.distances if pool is not None else np.full(node_count, np.inf)
+    previous = np.full(node_count, -1, dtype=np.int64)
+    settled = np.zeros(node_count, dtype=bool)
+
+    def relax_light(nodes):
+        if pool is not None and len(nodes) >= PARALLEL_MIN_FRONTIER:
+            return _apply(distances, previous, *pool.candidates(nodes))
+        return _apply(distances, previous, *_candidates(light, nodes, distances))
+
+    try:
+        distances[source] = 0
+        # Nodes with a finite tentative distance that may not be settled yet, duplicates allowed
+        active = np.array([source], dtype=np.int64)
+        while True:
+            active = np.unique(active[~settled[active]])
+            if len(active) == 0:
+                break
+
+            bucket_end = (np.floor(distances[active].min() / delta) + 1) * delta
+            in_bucket = distances[active] < bucket_end
+            frontier = active[in_bucket]
+            active = active[~in_bucket]
+
+            emptied = []
+            while len(frontier):
+                emptied.append(frontier)
+                improved = relax_light(frontier)
+                in_bucket = distances[improved] < bucket_end
+                frontier = improved[in_bucket]
+                active = np.concatenate((active, improved[~in_bucket]))
+
+            bucket = np.unique(np.concatenate(emptied))
+            settled[bucket] = True
+            improved = _apply(distances, previous, *_candidates(heavy, bucket, distances))
+            active = np.concatenate((active, improved))
+
+        return previous, np.array(distances)
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def delta_stepping(graph, source, delta: float = None, workers: int = 1) -> Tuple[Dict, Dict]:
+    """
+    Delta-stepping on a Graph, returns (previous, distances) keyed by node
+    exactly like Graph.dijkstra_algorithm without a target.
+    """
+    compact = CompactGraph.from_graph(graph)
+    previous, distances = delta_stepping_arrays(compact.offsets, compact.targets, compact.weights,
+                                                graph.node_ids[source], delta, workers)
+    integer = compact.weights.typecode == 'q'
+    nodes = graph.nodes
+    return (
+        {node: nodes[previous[i]] if previous[i] >= 0 else None for i, node in enumerate(nodes)},
+        {node: (int(distances[i]) if integer and distances[i] != np.inf else float(distances[i])) for i, node in enumerate(nodes)},
+    )
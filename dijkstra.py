@@ -1,146 +1,271 @@
-from variables import *
+from config import *
+import variables
 from dijkstra_parts import *
-from saving import save_graph, load_graph
+from saving import prepare_save, load_graph
+from graph_core import Graph as CoreGraph, GraphListener, SearchStats
+from spatial_index import SpatialIndex
+from renderer import Renderer
+from journal import EditJournal
+from render_cache import render_text
+import instrumentation
 
 import pygame
-from pygame import gfxdraw
-import math
+import argparse
+import config
 import sys
+import threading
+import time
 
-from typing import List, Dict
-from queue import PriorityQueue
+from typing import List, Optional
 
 
-# Initialize Pygame
-pygame.init()
-pygame.font.init()
 clock = pygame.time.Clock()
 
 graph = None
 buttons = []
+renderer = None
+# The running or finished solver animation, see SolverAnimation
+animation = None
+# Autosave journal of the edits, see journal.py
+journal = None
+# The load or save running on a worker thread, see BackgroundTask
+io_task = None
+# Ticks of the last refresh of the instrumentation overlay
+overlay_refreshed = 0
 
 
-class Graph:
+class Graph(CoreGraph):
+    node_class = Node
+    edge_class = Edge
+
     def __init__(self):
-        self.nodes: List[Node] = []
-        self.edges: List[Edge] = []
-        
-    def add_node(self, node: Node, name: str = None):
-        if name == None:
-            node.name = self.gen_name()
-        self.nodes.append(node)
-        
-    def add_edge(self, edge: Edge):
-        self.edges.append(edge)
-    
-    def gen_name(self):
-        return chr(ord('A') + len(self.nodes))
-    
-    def get_next_nodes(self, node: Node, visited: List[Node]) -> Dict[Node, int]:
-        """
-        Get the next nodes for a given node
-        Returns a dictionary with the next nodes and their weights
-        """
-        
-        next_nodes = {}
-        for edge in self.edges:
-            if edge.start == node:
-                next_nodes[edge.end] = edge.value
-                if edge.end not in visited:
-                    edge.end.value = edge.value
-            elif edge.end == node:
-                next_nodes[edge.start] = edge.value
-                if edge.start not in visited:
-                    edge.start.value = edge.value
-                
-        
-        return next_nodes
-    
-    def dijkstra_algorithm(self, start: Node):
-        # Initialize distances and previous node tracking
-        distances = {node: float('infinity') for node in self.nodes}
-        distances[start] = 0
-        start.value = 0  # Set the starting node value to 0
+        super().__init__()
+        # Grid of node and edge positions, all mouse hit-tests go through it
+        self.spatial_index = SpatialIndex(self)
+        self.listeners.append(self.spatial_index)
+        # Nodes that were under the mouse on the last motion event
+        self.hovered_nodes = set()
+        # Edge clicked for typing its weight and the nodes marked with 'q', so key presses don't search for them.
+        # Their action can be overwritten (drag, solver, reset), the action still decides whether they count.
+        self.selected_edge = None
+        self.connecting: List[Node] = []
+
+    def select_edge(self, edge: Edge):
+        """Marks edge for typing its weight, the previously selected edge is released"""
+        if self.selected_edge is not None and self.selected_edge.action == "Add":
+            self.selected_edge.action = None
+        edge.clicked()
+        self.selected_edge = edge
+
+    def typed_edge(self) -> Optional[Edge]:
+        """The edge typed digits go to, None when no edge is selected"""
+        edge = self.selected_edge
+        return edge if edge is not None and edge.action == "Add" else None
+
+    def remove_edge(self, edge: Edge):
+        if edge is self.selected_edge:
+            self.selected_edge = None
+        super().remove_edge(edge)
+
+    def remove_node(self, node: Node):
+        if node in self.connecting:
+            self.connecting.remove(node)
+        self.hovered_nodes.discard(node)
+        super().remove_node(node)
+
+    def clear(self):
+        self.selected_edge = None
+        self.connecting = []
+        self.hovered_nodes = set()
+        super().clear()
+
+    def replace_contents(self, other: CoreGraph):
+        self.selected_edge = None
+        self.connecting = []
+        self.hovered_nodes = set()
+        super().replace_contents(other)
+
+    def nodes_at(self, coords: tuple) -> List[Node]:
+        """Nodes under the mouse"""
+        return [node for node in self.spatial_index.nodes_near(coords) if node.mouse_over(coords)]
+
+    def edges_at(self, coords: tuple) -> List[Edge]:
+        """Edges under the mouse"""
+        return [edge for edge in self.spatial_index.edges_near(coords) if edge.mouse_over(coords)]
+
+    def hover(self, coords: tuple):
+        """Updates the hover colors of the nodes near the mouse and of the ones it just left"""
+        candidates = set(self.spatial_index.nodes_near(coords)) | self.hovered_nodes
+        self.hovered_nodes = {node for node in candidates if node.mouse_over(coords)}
+
+
+class SolverAnimation(GraphListener):
+    """
+    Animates Dijkstra's algorithm from start to end without blocking the window.
 
-        pq = PriorityQueue()
-        pq.put((0, start))
+    The main loop calls update once per frame; it runs the steps that are due
+    at the current speed (one per step_time ms) but never longer than
+    STEP_TIME_BUDGET per frame. Once the end is reached the path of the
+    configured solver method is marked and shown for END_GAME_WAIT_TIME.
+    Editing the graph while the solver runs cancels the animation.
+    """
 
-        previous = {node: None for node in self.nodes}
-        visited = set()
+    def __init__(self, graph: Graph, start: Node, end: Node, method: str = None):
+        self.graph = graph
+        self.start = start
+        self.end = end
+        self.method = config.SOLVER_METHOD if method is None else method
+
+        self.step_time = NEXT_NODE_WAIT_TIME
+        self.paused = False
+        self.skipping = False
+        self.done = False
+        self.closed = False
+        self.distance = None
+
+        # Steps owed to the animation at the current speed, fractions carry over to the next frame
+        self._due = 0.0
+        self._finished_at = None
+
+        # Solver counters, only collected while instrumentation is enabled
+        self.stats = SearchStats() if instrumentation.active() is not None else None
+        self._started = time.perf_counter()
+        self.steps = graph.dijkstra_steps(start, end, stats=self.stats)
+        graph.listeners.append(self)
+
+        # The same query on an unchanged graph is answered from the cache, the node values still show its search.
+        # A "dynamic" tree already kept for start was repaired after every edit, only its first query is animated.
+        # Roots in different components have no path, there is nothing to animate.
+        tree = graph._path_tree
+        if graph.path_key(start, end, method) in graph.path_cache or not graph.connected(start, end) or \
+                (method == "dynamic" and tree is not None and tree.source is start):
+            self._finish(None, None)
+            return
+
+        for node in graph.nodes:
+            node.value = float("infinity")
+        start.value = 0
+
+    def step(self) -> bool:
+        """Runs a single solver step, returns False once the solver is done"""
+        if self.done:
+            return False
+        try:
+            step = next(self.steps)
+        except StopIteration as stop:
+            self._finish(*stop.value)
+            return False
+
+        for node, distance in step.relaxed:
+            node.value = distance
+        step.node.value = step.distance
+        step.node.action = "Current"
+        if step.node is self.end:
+            print(f"Found a root node (not the starting root): {step.node.name}")
+        return True
+
+    def update(self, elapsed: int):
+        """Advances the animation by elapsed ms of wall time"""
+        if self.closed:
+            return
+        if self.done:
+            if pygame.time.get_ticks() - self._finished_at >= END_GAME_WAIT_TIME:
+                self.close()
+            return
+        if self.paused:
+            return
+
+        self._due += elapsed / self.step_time
+        deadline = time.perf_counter() + STEP_TIME_BUDGET / 1000
+        stepped = False
+        with instrumentation.phase("solver_steps"):
+            while (self.skipping or self._due >= 1) and time.perf_counter() < deadline:
+                self._due = max(0.0, self._due - 1)
+                stepped = True
+                if not self.step():
+                    break
+        if stepped:
+            get_renderer(self.graph).invalidate()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self._due = 0.0
+
+    def single_step(self):
+        """Pauses and runs exactly one step"""
+        self.paused = True
+        self.step()
+        get_renderer(self.graph).invalidate()
+
+    def skip_to_end(self):
+        self.paused = False
+        self.skipping = True
+
+    def change_speed(self, factor: float):
+        """Multiplies the time between two steps by factor"""
+        self.step_time = min(MAX_STEP_TIME, max(MIN_STEP_TIME, self.step_time * factor))
+
+    def _finish(self, previous: dict, distances: dict):
+        """Marks the shortest path and shows the total distance"""
+        self.done = True
+        self._finished_at = pygame.time.get_ticks()
+        reset_node_actions(self.graph)
+
+        recording = instrumentation.active()
+        if recording is not None and self.stats is not None and previous is not None:
+            # Spans the whole animation, the solver work itself is in the "solver_steps" phases
+            recording.add_query("dijkstra (animated)", self.stats, self._started, time.perf_counter())
+
+        if self.method == "dijkstra" and previous is not None:
+            result = self.graph.build_path(previous, distances, self.start, self.end)
+            self.graph.path_cache.put(self.graph.path_key(self.start, self.end, self.method), result)
+        else:
+            result = self.graph.find_shortest_path(self.start, self.end, method=self.method)
 
-        while not pq.empty():
-            current_distance, current_node = pq.get()
+        if self.method == "dynamic":
+            # Reused trees know the distances of every node, show them directly
+            for node, distance in self.graph.shortest_path_tree(self.start).distances.items():
+                node.value = distance
 
-            if current_node in visited:
-                continue
+        for edge in result.edges:
+            edge.action = "Shortest"
 
-            visited.add(current_node)
+        if result.distance is not None:
+            print(f"Shortest path from {self.start.name} to {self.end.name}: {[node.name for node in result.nodes]}")
+            print(f"Total distance: {result.distance}")
+        else:
+            print(f"No path found from {self.start.name} to {self.end.name}")
+        self.distance = result.distance
 
-            # Update node's value to the current distance from the start node
-            current_node.value = current_distance
+        renderer = get_renderer(self.graph)
+        renderer.set_score(self.distance)
+        renderer.invalidate()
 
-            # Check if current node is a root (but not the start node)
-            if current_node.root and current_node != start:
-                print(f"Found a root node (not the starting root): {current_node.name}")
-                draw_game(self)
-                break
+    def close(self):
+        """Clears the marks of the animation and stops listening to the graph"""
+        if self.closed:
+            return
+        self.closed = True
+        self.steps.close()
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
 
-            # Explore neighbors
-            for neighbor, weight in self.get_next_nodes(current_node, visited).items():
-                if neighbor in visited:
-                    continue
-                new_distance = current_distance + weight
-
-                # Update distance if a shorter path is found
-                if new_distance < distances[neighbor]:
-                    distances[neighbor] = new_distance
-                    previous[neighbor] = current_node
-                    pq.put((new_distance, neighbor))
+        reset_node_actions(self.graph)
+        reset_edge_actions(self.graph)
+        renderer = get_renderer(self.graph)
+        renderer.set_score(None)
+        renderer.invalidate()
 
-                    # Update neighbor node's value to the new distance
-                    neighbor.value = new_distance
+    # GraphListener, any edit makes the running solver stale
 
-            current_node.action = "Current"
-            draw_game(self)
-            pygame.time.wait(NEXT_NODE_WAIT_TIME)  # Slow down visualization for 2.5 seconds
-        
-        # Reset node actions after the algorithm finishes
-        reset_node_actions(self)
-
-        return previous, distances
-
-    def get_shortest_path(self, start: Node, end: Node):
-        """
-        Returns the shortest path from start node to end node using the 'previous' dictionary.
-        """
-        for node in self.nodes:
-            node.value = float("infinity")        
-        previous, distances = self.dijkstra_algorithm(start)
-        path = []
-        current_node = end
-
-        # Backtrack from the end node to the start node using the previous dictionary
-        while current_node is not None:
-            path.append(current_node)
-            previous_node = previous.get(current_node, None)
-            for edge in self.edges:
-                if edge.start == previous_node and edge.end == current_node or edge.end == previous_node and edge.start == current_node:
-                    edge.action = "Shortest"
-            
-            current_node = previous_node
-                    
+    def _edited(self, *args):
+        if not self.done:
+            print("Graph edited, solver stopped")
+        self.close()
 
-        path.reverse()
+    node_added = node_removed = edge_added = edge_removed = edge_value_changed = graph_cleared = _edited
 
-        if path and path[0] == start:
-            print(f"Shortest path from {start.name} to {end.name}: {[node.name for node in path]}")
-            print(f"Total distance: {distances[end]}")
-            return distances[end]
-        else:
-            print(f"No path found from {start.name} to {end.name}")
-            return None
     
-
 class Button:
     def __init__(self, x: int, y: int, width: int, height: int, text: str, function=None):
         self.x = x
@@ -155,12 +280,14 @@ class Button:
         self.border_color = BLACK
         self.border_width = BORDER_WIDTH
         
-    def draw(self):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
-        pygame.draw.rect(screen, self.border_color, (self.x, self.y, self.width, self.height), self.border_width)
+    def draw(self, surface: pygame.Surface = None) -> pygame.Rect:
+        surface = surface or variables.screen
+        area = pygame.draw.rect(surface, self.color, (self.x, self.y, self.width, self.height))
+        pygame.draw.rect(surface, self.border_color, (self.x, self.y, self.width, self.height), self.border_width)
 
-        text = FONT.render(self.text, True, BLACK)
-        screen.blit(text, (self.x + self.width / 2 - text.get_width() / 2, self.y + self.height / 2 - text.get_height() / 2))
+        text = render_text(self.text, variables.FONT, BLACK)
+        surface.blit(text, (self.x + self.width / 2 - text.get_width() / 2, self.y + self.height / 2 - text.get_height() / 2))
+        return area
 
     
     def mouse_over(self, coords: tuple):
@@ -187,15 +314,53 @@ class MakeNodeButton(Button):
             self.function(Node((self.x + self.width) * 2 , self.y + self.height))
             return True
         
+class BackgroundTask:
+    """
+    Runs function on a worker thread. The main loop polls done once per
+    frame and picks up result or error; progress is a fraction set by the worker.
+    """
+
+    def __init__(self, label: str, function):
+        self.label = label
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(function,), daemon=True)
+        self._thread.start()
+
+    def _run(self, function):
+        try:
+            self.result = function(self)
+        except Exception as error:
+            self.error = error
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def status(self) -> str:
+        return f"{self.label} {int(self.progress * 100)}%"
+
+
+class StagingGraph(CoreGraph):
+    """Editor nodes and edges without the editor's listeners, loaded on a worker thread"""
+    node_class = Node
+    edge_class = Edge
+
+
 class SaveGraphButton(Button):
     def __init__(self, x: int, y: int, width: int, height: int, graph: Graph):
-        super().__init__(x, y, width, height, "Save Graph", save_graph)
+        super().__init__(x, y, width, height, "Save Graph", prepare_save)
         self.graph = graph
     
     def clicked(self):
-        if self.function is not None:
+        global io_task
+        if self.function is not None and io_task is None:
             self.color = DARK_GRAY
-            self.function(self.graph)
+            # The graph is copied here, only the writing happens on the worker
+            with instrumentation.phase("save_prepare"):
+                write = self.function(self.graph, config.SAVE_PATH)
+            io_task = BackgroundTask("Saving", lambda task: write())
             return True
     
 class LoadGraphButton(Button):
@@ -204,24 +369,23 @@ class LoadGraphButton(Button):
         self.graph = graph
     
     def clicked(self):
-        if self.function is not None:
+        global io_task
+        if self.function is not None and io_task is None:
             self.color = DARK_GRAY
 
-            self.function(self.graph)
+            # Built off to the side and swapped in by update_io once complete
+            def load(task):
+                return self.function(StagingGraph(), config.LOAD_PATH, progress=lambda fraction: setattr(task, 'progress', fraction))
+
+            io_task = BackgroundTask("Loading", load)
             return True
             
 
 def connect_nodes(graph, connected_nodes):
     """Connect two nodes with an edge"""
-    connect = True
-    for edge in graph.edges:
-        if (edge.start == connected_nodes[0] and edge.end == connected_nodes[1]) or \
-           (edge.start == connected_nodes[1] and edge.end == connected_nodes[0]):
-            print("Nodes already connected!")
-            connect = False
-            break
-
-    if connect:
+    if graph.has_edge(connected_nodes[0], connected_nodes[1]):
+        print("Nodes already connected!")
+    else:
         graph.add_edge(Edge(connected_nodes[0], connected_nodes[1]))
         print(f"Nodes connected: {connected_nodes[0].name}, {connected_nodes[1].name}")
         
@@ -266,8 +430,8 @@ def handle_numeric_input(event , node: Node):
         numeric_input += chr(event.key) 
 
     # Check for numeric keypad keys (K_KP0 to K_KP9)
-    elif event.key in keypad_mapping:
-        numeric_input += keypad_mapping.get(event.key)
+    elif event.key in variables.keypad_mapping:
+        numeric_input += variables.keypad_mapping.get(event.key)
 
     elif event.key == pygame.K_BACKSPACE:
         numeric_input = numeric_input[:-1]
@@ -282,6 +446,10 @@ def handle_numeric_input(event , node: Node):
 
 
 def event_handler(buttons: List[Button], graph: Graph):
+    global animation
+    renderer = get_renderer(graph)
+    if animation is not None and animation.closed:
+        animation = None
     action_node = None
     connected_nodes = []
     root_nodes = []
@@ -291,6 +459,9 @@ def event_handler(buttons: List[Button], graph: Graph):
     for event in pygame.event.get():
         # Quit event handling
         if event.type == pygame.QUIT or (event.type == pygame.KEYUP and event.key == pygame.K_ESCAPE):
+            if journal is not None:
+                journal.close()
+            stop_instrumentation()
             pygame.quit()
             sys.exit()
 
@@ -300,11 +471,8 @@ def event_handler(buttons: List[Button], graph: Graph):
             for button in buttons:
                 button.mouse_over((mouse_x, mouse_y))
 
-            for node in graph.nodes:
-                node.mouse_over((mouse_x, mouse_y))
-
-            for edge in graph.edges:
-                edge.mouse_over((mouse_x, mouse_y))
+            with instrumentation.phase("hover"):
+                graph.hover((mouse_x, mouse_y))
 
          # Mouse button click event
 
@@ -317,28 +485,28 @@ def event_handler(buttons: List[Button], graph: Graph):
                     button.clicked()
 
             # Edge click
-            for edge in graph.edges:
-                if edge.mouse_over((mouse_x, mouse_y)):
-                    # Reset the action of all edges marked as "Add"
-                    for other_edge in graph.edges:
-                        if other_edge.action == "Add":
-                            other_edge.action = False
-                    edge.clicked()
-                    break
+            for edge in graph.edges_at((mouse_x, mouse_y)):
+                graph.select_edge(edge)
+                break
 
         # Node dragging with left mouse button
         if event.type == pygame.MOUSEMOTION and pygame.mouse.get_pressed()[0]:
-            for node in graph.nodes:
-                if node.mouse_over((mouse_x, mouse_y)):
-                    if node.action == "Move":
-                        action_node = node
-                        break
-                    else:
-                        action_node = node
+            for node in graph.nodes_at((mouse_x, mouse_y)):
+                if node.action == "Move":
+                    action_node = node
+                    break
+                else:
+                    action_node = node
 
             if action_node is not None:
                 action_node.clicked((mouse_x, mouse_y))
+                graph.node_moved(action_node)
 
+        # Motion only changes what follows the mouse, everything else may change the whole picture
+        if event.type == pygame.MOUSEMOTION:
+            renderer.track(graph.hovered_nodes, action_node)
+        else:
+            renderer.invalidate()
 
         # Key event handling
         if event.type == pygame.KEYUP:
@@ -348,17 +516,17 @@ def event_handler(buttons: List[Button], graph: Graph):
 
             # Create a new edge when 'q' is pressed
             elif event.key == pygame.K_q:
-                for node in graph.nodes:
-                    if node.action == "Connect":
-                        connected_nodes.append(node)
+                connected_nodes = [node for node in graph.connecting if node.action == "Connect"]
 
-                    elif node.mouse_over((mouse_x, mouse_y)):
+                for node in graph.nodes_at((mouse_x, mouse_y)):
+                    if node.action != "Connect":
                         node.action = "Connect"
                         connected_nodes.append(node)
                 
                 if len(connected_nodes) == 2:
                     connect_nodes(graph, connected_nodes)
                     connected_nodes.clear()  # Reset for next connection
+                graph.connecting = connected_nodes
 
             # Cancel all node actions when 'r' is pressed
             elif event.key == pygame.K_r:
@@ -366,21 +534,11 @@ def event_handler(buttons: List[Button], graph: Graph):
 
             # Remove node when 'c' is pressed
             elif event.key == pygame.K_c:
-                for node in graph.nodes:
-                    if node.mouse_over((mouse_x, mouse_y)):
-
-                        edges_to_delete = []
-                        for edge in graph.edges:
-                            if edge.start == node or edge.end == node:
-                                edges_to_delete.append(edge)
-
-                        for edge in edges_to_delete:
-                            graph.edges.remove(edge)
-                        graph.nodes.remove(node)
+                for node in graph.nodes_at((mouse_x, mouse_y)):
+                    graph.remove_node(node)
             
-                for edge in graph.edges:
-                    if edge.mouse_over((mouse_x, mouse_y)):
-                        graph.edges.remove(edge)
+                for edge in graph.edges_at((mouse_x, mouse_y)):
+                    graph.remove_edge(edge)
 
             # Mark node as root when 'f' is pressed
             elif event.key == pygame.K_f:
@@ -388,68 +546,184 @@ def event_handler(buttons: List[Button], graph: Graph):
                     if node.root == True:
                         root_nodes.append(node)
 
-                    if node.mouse_over((mouse_x, mouse_y)):
-                        node.root = True
+                for node in graph.nodes_at((mouse_x, mouse_y)):
+                    node.root = True
+                    if journal is not None:
+                        journal.root_changed(node)
                     
                 if len(root_nodes) >= 2:
                     for node in root_nodes:
                         node.root = False
+                        if journal is not None:
+                            journal.root_changed(node)
                     root_nodes.clear()
 
-            # Dijkstra's algorithm when 'space' is pressed
+            # Dijkstra's algorithm when 'space' is pressed, pauses and resumes a running one
             elif event.key == pygame.K_SPACE:
+                if animation is not None and not animation.done:
+                    animation.toggle_pause()
+                    continue
+                if animation is not None:
+                    animation.close()
+
                 root_nodes = [node for node in graph.nodes if node.root]
                 if len(root_nodes) == 2:
                 
                     start_node = next((node for node in graph.nodes if node.root), None)
                     
                     if start_node:
-                        distance = graph.get_shortest_path(start_node, root_nodes[1])
-                        draw_game(graph, distance)
-                        pygame.time.wait(END_GAME_WAIT_TIME)
+                        animation = SolverAnimation(graph, start_node, root_nodes[1])
+
+            # Start or stop the instrumentation when 'i' is pressed
+            elif event.key == pygame.K_i:
+                toggle_instrumentation()
+
+            # Solver controls: 'n' single step, 's' skip to the end, '+' and '-' change the speed
+            elif animation is not None and not animation.done and event.key == pygame.K_n:
+                animation.single_step()
+
+            elif animation is not None and not animation.done and event.key == pygame.K_s:
+                animation.skip_to_end()
+
+            elif animation is not None and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                animation.change_speed(0.5)
 
-                        reset_node_actions(graph)
-                        reset_edge_actions(graph)
+            elif animation is not None and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                animation.change_speed(2)
 
             else:
                 # Get the target edge
-                target_edge = next((edge for edge in graph.edges if edge.action == "Add"), None)
+                target_edge = graph.typed_edge()
 
                 if target_edge is not None:
                     numeric_input = int(handle_numeric_input(event, target_edge))
 
                     # If input received, then update the value
                     if numeric_input is not None:
-                        target_edge.value = numeric_input
+                        graph.set_edge_value(target_edge, numeric_input)
+
+
+def get_renderer(graph: Graph) -> Renderer:
+    """The renderer of graph, created and registered as a listener on first use"""
+    global renderer
+    if renderer is None or renderer.graph is not graph:
+        if renderer is not None and renderer in renderer.graph.listeners:
+            renderer.graph.listeners.remove(renderer)
+        renderer = Renderer(graph, buttons)
+        graph.listeners.append(renderer)
+    return renderer
+
+
+def update_animation(elapsed: int):
+    """Advances the solver animation by the time the last frame took"""
+    global animation
+    if animation is not None:
+        animation.update(elapsed)
+        if animation.closed:
+            animation = None
+
+
+def update_io(graph: Graph):
+    """Shows the progress of the background load or save and swaps a loaded graph in once it is done"""
+    global io_task
+    if io_task is None:
+        return
+    renderer = get_renderer(graph)
+    if not io_task.done:
+        renderer.set_status(io_task.status())
+        return
+
+    if io_task.error is not None:
+        print(f"{io_task.label} failed: {io_task.error}")
+    elif isinstance(io_task.result, CoreGraph):
+        with instrumentation.phase("swap_graph"):
+            graph.replace_contents(io_task.result)
+        graph.hovered_nodes = set()
+    renderer.set_status(None)
+    io_task = None
 
 
 def draw_game(graph: Graph, score: int = None):
-    screen.fill(WHITE)
-
-    if score is not None:
-        score_text = SCORE_FONT.render(f"Score: {score}", True, BLACK)
-        screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT - score_text.get_height() - 10))
-
-    for edge in graph.edges:
-        edge.draw()
-    for node in graph.nodes:
-        node.draw()
-    for button in buttons:
-        button.draw()
-
-    pygame.display.update()
-
-
-def main():
+    """Redraws the whole window"""
+    with instrumentation.phase("draw_game"):
+        renderer = get_renderer(graph)
+        renderer.set_score(score)
+        renderer.invalidate()
+        renderer.render()
+
+
+def toggle_instrumentation():
+    """Starts instrumenting, or stops and writes the recorded trace"""
+    if instrumentation.active() is None:
+        instrumentation.enable()
+        print("Instrumentation enabled")
+    else:
+        stop_instrumentation()
+
+
+def stop_instrumentation():
+    recording = instrumentation.disable()
+    if recording is not None:
+        recording.write_chrome_trace(config.PROFILE_TRACE_PATH)
+        print(f"Instrumentation trace written to {config.PROFILE_TRACE_PATH}")
+
+
+def update_overlay(graph: Graph):
+    """Shows the instrumentation summary next to the score, refreshed a few times per second"""
+    global overlay_refreshed
+    renderer = get_renderer(graph)
+    recording = instrumentation.active()
+    if recording is None or not config.PROFILE_OVERLAY:
+        renderer.set_overlay(None)
+        return
+    now = pygame.time.get_ticks()
+    if now - overlay_refreshed >= config.PROFILE_OVERLAY_REFRESH:
+        overlay_refreshed = now
+        renderer.set_overlay(recording.overlay_text())
+
+
+def parse_args(argv=None) -> dict:
+    """Settings given on the command line, as config.py constant names"""
+    parser = argparse.ArgumentParser(description="Interactive graph editor and shortest path solver",
+                                     epilog="Any constant of config.py can also be set as the environment variable DIJKSTRA_<NAME>.")
+    parser.add_argument("--save-path", dest="SAVE_PATH")
+    parser.add_argument("--load-path", dest="LOAD_PATH")
+    parser.add_argument("--max-fps", dest="MAX_FPS", type=int)
+    parser.add_argument("--solver", dest="SOLVER_METHOD",
+                        choices=["dijkstra", "bidirectional", "astar", "alt", "ch", "dynamic", "apsp", "delta"])
+    parser.add_argument("--no-autosave", dest="AUTOSAVE", action="store_false", default=None)
+    parser.add_argument("--profile", dest="PROFILE", action="store_true", default=None)
+    return {name: value for name, value in vars(parser.parse_args(argv)).items() if value is not None}
+
+
+def main(argv=None):
+    global journal
+    config.override(**parse_args(argv))
+
+    pygame.init()
     graph = Graph()
+    if config.AUTOSAVE:
+        # Restores the graph of the last session and journals every edit from here on
+        journal = EditJournal.open(graph, config.SAVE_PATH)
     buttons.append(MakeNodeButton(10, 10, 100, 50, graph.add_node))
     buttons.append(SaveGraphButton(10, 70, 100, 50, graph))
     buttons.append(LoadGraphButton(10, 130, 100, 50, graph))
+    if config.PROFILE:
+        instrumentation.enable()
 
     while True:
-        event_handler(graph=graph, buttons=buttons)
-        draw_game(graph)
-        clock.tick(MAX_FPS)
+        # The frame phase leaves out the wait for the next frame
+        with instrumentation.phase("frame"):
+            with instrumentation.phase("event_handler"):
+                event_handler(graph=graph, buttons=buttons)
+            update_animation(clock.get_time())
+            update_io(graph)
+            if journal is not None:
+                journal.tick()
+            update_overlay(graph)
+            with instrumentation.phase("render"):
+                get_renderer(graph).render()
+        clock.tick(config.MAX_FPS)
 
 
 if __name__ == "__main__":
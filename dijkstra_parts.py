@@ -1,18 +1,19 @@
-from variables import *
+from config import *
+import variables
+from graph_core import GraphNode, GraphEdge
+from render_cache import render_text, node_sprite
 import pygame
-from pygame import gfxdraw
 import math
 
 def get_mouse_coords():
     return pygame.mouse.get_pos()
 
-class Node:
+class Node(GraphNode):
+    __slots__ = ('action', 'radius', 'color', 'border_width', 'border_color', 'parent')
+
     def __init__(self, x: int, y: int, name: str = None):
-        self.x = x
-        self.y = y
-        self.name = name
+        super().__init__(x, y, name)
 
-        self.root = None
         self.action = None
 
         self.radius = NODE_RADIUS
@@ -20,33 +21,30 @@ class Node:
         self.border_width = BORDER_WIDTH
         self.border_color = BLACK
 
-        self.value = 0
         self.parent = None
         
-    def draw(self):
-        """Draws the node"""
+    def draw(self, surface: pygame.Surface = None, connect_line: bool = True) -> pygame.Rect:
+        """Draws the node on surface (the screen by default) and returns the area it covered"""
+        surface = surface or variables.screen
 
         self.check_actions()
 
-        # Draw circle
-        gfxdraw.filled_circle(screen, self.x, self.y, self.radius, self.color)
-        gfxdraw.aacircle(screen, self.x, self.y, self.radius-1, self.color)
+        # Draw circle with its border from the sprite cache
+        area = surface.blit(node_sprite(self.radius, self.color, self.border_color), (self.x - self.radius - 2, self.y - self.radius - 2))
 
         # Draw value in right corner
-        text = FONT.render(str(self.value), True, BLACK)
-        screen.blit(text, (self.x + self.radius, self.y - self.radius))
+        text = render_text(str(self.value), variables.FONT, BLACK)
+        area.union_ip(surface.blit(text, (self.x + self.radius, self.y - self.radius)))
 
         # Draw name in center
-        text = FONT.render(self.name, True, BLACK)
-        screen.blit(text, (self.x - text.get_width() // 2, self.y - text.get_height() // 2))
-
-        # Create border
-        gfxdraw.aacircle(screen, self.x, self.y, self.radius, self.border_color)
-        gfxdraw.aacircle(screen, self.x, self.y, self.radius+1, self.border_color)
+        text = render_text(self.name, variables.FONT, BLACK)
+        area.union_ip(surface.blit(text, (self.x - text.get_width() // 2, self.y - text.get_height() // 2)))
 
-        if self.action == "Connect":
+        if self.action == "Connect" and connect_line:
             mouse_x, mouse_y = get_mouse_coords()
-            pygame.draw.line(screen, self.border_color, (self.x, self.y), (mouse_x, mouse_y), self.border_width)
+            area.union_ip(pygame.draw.line(surface, self.border_color, (self.x, self.y), (mouse_x, mouse_y), self.border_width))
+
+        return area
 
     def check_actions(self):
         if self.root == True:
@@ -77,41 +75,39 @@ class Node:
         self.color = DARK_GRAY
         self.action = "Move"
         return True
-            
-    def __lt__(self, other):
-        return self.value < other.value
-
-    def __name__(self):
-        return self.name
 
     def to_dict(self):
         """Convert Node to a dictionary."""
-        return {
-            'x': self.x,
-            'y': self.y,
-            'name': self.name,
-            'root': self.root,
-            'radius': self.radius,
-            'value': self.value,
-        }
+        node_data = super().to_dict()
+        node_data['radius'] = self.radius
+        return node_data
+
+    @classmethod
+    def from_dict(cls, node_data: dict):
+        """Create a Node from a dictionary made by to_dict."""
+        node = super().from_dict(node_data)
+        node.radius = node_data.get('radius', NODE_RADIUS)
+        return node
     
-class Edge:
+class Edge(GraphEdge):
+    __slots__ = ('action', 'color', 'width')
+
     def __init__(self, start: Node, end: Node):
-        self.start = start
-        self.end = end
+        super().__init__(start, end)
         self.action = None
-        self.value = 1
 
         self.color = BLACK
         self.width = EDGE_THICKNESS
         
-    def draw(self):
-        """Draws the edge"""
+    def draw(self, surface: pygame.Surface = None) -> pygame.Rect:
+        """Draws the edge on surface (the screen by default) and returns the area it covered"""
+        surface = surface or variables.screen
         self.set_color()
         
-        pygame.draw.line(screen, self.color, (self.start.x, self.start.y), (self.end.x, self.end.y), self.width) 
-        text = FONT.render(str(self.value), True, BLACK)
-        screen.blit(text, ((self.start.x + self.end.x) // 2 - text.get_width() // 2 + 20 , (self.start.y + self.end.y) // 2 - text.get_height() // 2 - 20))
+        area = pygame.draw.line(surface, self.color, (self.start.x, self.start.y), (self.end.x, self.end.y), self.width) 
+        text = render_text(str(self.value), variables.FONT, BLACK)
+        area.union_ip(surface.blit(text, ((self.start.x + self.end.x) // 2 - text.get_width() // 2 + 20 , (self.start.y + self.end.y) // 2 - text.get_height() // 2 - 20)))
+        return area
 
     def calculate_new_edge_points(self):
         """
@@ -172,11 +168,3 @@ class Edge:
             self.color = GREEN
         else:
             self.color = BLACK
-
-    def to_dict(self):
-        """Convert Edge to a dictionary."""
-        return {
-            'start': self.start.name,
-            'end': self.end.name,
-            'value': self.value
-        }
@@ -0,0 +1,179 @@
+"""
+Single-source shortest path tree that is repaired after edits instead of being
+recomputed.
+
+The tree listens to its Graph (see GraphListener). A lighter or new edge can
+only shorten paths, so the improvement is pushed outwards with a Dijkstra that
+starts at the improved endpoint and stops where nothing gets shorter. A heavier
+or removed edge only matters when it is a tree edge; then the subtree below it
+loses its distances, takes the best distance offered by its unaffected
+neighbours and is settled again with a Dijkstra restricted to the subtree.
+Either way the work is proportional to the nodes whose distance changed.
+"""
+from typing import Dict, Set, Tuple
+
+from graph_core import GraphEdge, GraphListener, GraphNode, PathResult, SolverObserver
+from priority_queues import HeapQueue
+
+INFINITY = float('infinity')
+
+
+class DynamicShortestPathTree(GraphListener):
+    def __init__(self, graph, source: GraphNode, observer: SolverObserver = None):
+        self.graph = graph
+        self.source = source
+
+        self.distances: Dict[GraphNode, float] = {}
+        # node -> (parent node, tree edge), None for the source and unreached nodes
+        self.parent: Dict[GraphNode, Tuple[GraphNode, GraphEdge]] = {}
+        self.children: Dict[GraphNode, Set[GraphNode]] = {node: set() for node in graph.nodes}
+        # Nodes whose distance was touched by the last repair
+        self.last_repair = 0
+
+        previous, distances = graph.dijkstra_algorithm(source, observer=observer)
+        # The tree is repaired in place, the solver's result may be a shared cache entry
+        self.distances = dict(distances)
+        for node, previous_node in previous.items():
+            self.parent[node] = None
+            if previous_node is not None:
+                self._attach(node, previous_node, graph.get_edge(node, previous_node))
+
+    def path_to(self, end: GraphNode) -> PathResult:
+        """Path from the source to end read off the tree"""
+        if self.source is None or self.distances.get(end, INFINITY) == INFINITY:
+            return PathResult([], [], None)
+
+        nodes = [end]
+        edges = []
+        while self.parent.get(nodes[-1]) is not None:
+            parent, edge = self.parent[nodes[-1]]
+            nodes.append(parent)
+            edges.append(edge)
+        nodes.reverse()
+        edges.reverse()
+        return PathResult(nodes, edges, self.distances[end])
+
+    def _attach(self, node: GraphNode, parent: GraphNode, edge: GraphEdge):
+        self._detach(node)
+        self.parent[node] = (parent, edge)
+        self.children.setdefault(parent, set()).add(node)
+
+    def _detach(self, node: GraphNode):
+        link = self.parent.get(node)
+        if link is not None:
+            self.children[link[0]].discard(node)
+        self.parent[node] = None
+
+    def _propagate(self, queue: HeapQueue, restricted_to: Set[GraphNode] = None):
+        """Dijkstra from the queued nodes, only improving distances (within restricted_to if given)"""
+        distances = self.distances
+        adjacency = self.graph.adjacency
+        while queue:
+            distance, node = queue.pop()
+            if distance > distances.get(node, INFINITY):
+                continue
+            self.last_repair += 1
+            for neighbor, weight, edge in adjacency.get(node, []):
+                if restricted_to is not None and neighbor not in restricted_to:
+                    continue
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbor, INFINITY):
+                    distances[neighbor] = new_distance
+                    self._attach(neighbor, node, edge)
+                    queue.push(neighbor, new_distance)
+
+    def _relax_edge(self, edge: GraphEdge):
+        """The edge got lighter or was added, push improvements from both endpoints"""
+        queue = HeapQueue()
+        for start, end in ((edge.start, edge.end), (edge.end, edge.start)):
+            new_distance = self.distances.get(start, INFINITY) + edge.value
+            if new_distance < self.distances.get(end, INFINITY):
+                self.distances[end] = new_distance
+                self._attach(end, start, edge)
+                queue.push(end, new_distance)
+        self._propagate(queue)
+
+    def _repair_subtree(self, root: GraphNode):
+        """Recomputes the distances of root and everything below it in the tree"""
+        affected = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            affected.add(node)
+            stack.extend(self.children.get(node, ()))
+
+        for node in affected:
+            self.distances[node] = INFINITY
+            self._detach(node)
+
+        # Best entry point into the subtree from the unaffected part of the tree
+        queue = HeapQueue()
+        adjacency = self.graph.adjacency
+        for node in affected:
+            for neighbor, weight, edge in adjacency.get(node, []):
+                if neighbor in affected:
+                    continue
+                new_distance = self.distances.get(neighbor, INFINITY) + weight
+                if new_distance < self.distances[node]:
+                    self.distances[node] = new_distance
+                    self._attach(node, neighbor, edge)
+            if self.distances[node] < INFINITY:
+                queue.push(node, self.distances[node])
+
+        self._propagate(queue, restricted_to=affected)
+
+    def _tree_child(self, edge: GraphEdge):
+        """The endpoint that hangs below edge in the tree, None for non-tree edges"""
+        for node in (edge.start, edge.end):
+            link = self.parent.get(node)
+            if link is not None and link[1] is edge:
+                return node
+        return None
+
+    # GraphListener
+
+    def node_added(self, node: GraphNode):
+        self.distances[node] = INFINITY
+        self.parent[node] = None
+        self.children[node] = set()
+
+    def node_removed(self, node: GraphNode):
+        if node is self.source:
+            self.graph_cleared()
+            return
+        self._detach(node)
+        self.distances.pop(node, None)
+        self.parent.pop(node, None)
+        self.children.pop(node, None)
+
+    def edge_added(self, edge: GraphEdge):
+        if self.source is None:
+            return
+        self.last_repair = 0
+        self._relax_edge(edge)
+
+    def edge_removed(self, edge: GraphEdge):
+        if self.source is None:
+            return
+        self.last_repair = 0
+        child = self._tree_child(edge)
+        if child is not None:
+            self._repair_subtree(child)
+
+    def edge_value_changed(self, edge: GraphEdge, old_value: int):
+        if self.source is None:
+            return
+        self.last_repair = 0
+        if edge.value < old_value:
+            self._relax_edge(edge)
+        elif edge.value > old_value:
+            child = self._tree_child(edge)
+            if child is not None:
+                self._repair_subtree(child)
+
+    def graph_cleared(self):
+        """The tree is useless now, Graph.shortest_path_tree builds a new one on the next query"""
+        self.source = None
+        self.distances.clear()
+        self.parent.clear()
+        self.children.clear()
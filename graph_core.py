@@ -0,0 +1,697 @@
+"""
+Graph model and shortest path solver.
+
+Nothing in here imports pygame, so the module can be used as a library on
+machines without a display. The visual editor in dijkstra.py subclasses these
+classes and runs the solver step by step through Graph.dijkstra_steps.
+"""
+import hashlib
+import math
+import time
+from typing import List, Dict, Tuple, NamedTuple, Optional
+
+import instrumentation
+from components import DisjointSet
+from priority_queues import make_queue
+from query_cache import MISSING, PATH_CACHE_SIZE, QueryCache, TREE_CACHE_SIZE
+
+
+class GraphNode:
+    __slots__ = ('x', 'y', 'name', 'root', 'value')
+
+    def __init__(self, x: int, y: int, name: str = None):
+        self.x = x
+        self.y = y
+        self.name = name
+
+        self.root = False
+        self.value = 0
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __name__(self):
+        return self.name
+
+    def to_dict(self):
+        """Convert Node to a dictionary."""
+        return {
+            'x': self.x,
+            'y': self.y,
+            'name': self.name,
+            'root': self.root,
+            'value': self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, node_data: dict):
+        """Create a Node from a dictionary made by to_dict."""
+        node = cls(x=node_data['x'], y=node_data['y'], name=node_data['name'])
+        node.root = node_data.get('root', False)
+        node.value = node_data.get('value', 0)
+        return node
+
+
+class GraphEdge:
+    __slots__ = ('start', 'end', 'value')
+
+    def __init__(self, start: GraphNode, end: GraphNode):
+        self.start = start
+        self.end = end
+        self.value = 1
+
+    def to_dict(self):
+        """Convert Edge to a dictionary."""
+        return {
+            'start': self.start.name,
+            'end': self.end.name,
+            'value': self.value
+        }
+
+    @classmethod
+    def from_dict(cls, edge_data: dict, node_map: Dict[str, GraphNode]):
+        """Create an Edge from a dictionary made by to_dict."""
+        edge = cls(start=node_map[edge_data['start']], end=node_map[edge_data['end']])
+        edge.value = edge_data.get('value', 1)
+        return edge
+
+
+class PathResult(NamedTuple):
+    nodes: List[GraphNode]
+    edges: List[GraphEdge]
+    distance: Optional[float]
+
+
+class SolverStep(NamedTuple):
+    """One settled node of Graph.dijkstra_steps and the tentative distances it improved"""
+    node: GraphNode
+    distance: float
+    relaxed: List[Tuple[GraphNode, float]]
+
+
+class SearchStats:
+    """Counters filled in by the solvers when a stats object is passed in"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.settled = 0
+        self.relaxed = 0
+        self.pushes = 0
+        self.pops = 0
+        # Pops of nodes that were already settled through a shorter entry
+        self.stale_pops = 0
+
+    def add_queue(self, queue):
+        """Counts the outdated entries a priority queue skipped internally as stale pops"""
+        self.pops += queue.stale
+        self.stale_pops += queue.stale
+
+    def as_dict(self) -> dict:
+        return {'settled': self.settled, 'relaxed': self.relaxed, 'pushes': self.pushes,
+                'pops': self.pops, 'stale_pops': self.stale_pops}
+
+    def __repr__(self):
+        return (f"SearchStats(settled={self.settled}, relaxed={self.relaxed}, pushes={self.pushes}, "
+                f"pops={self.pops}, stale_pops={self.stale_pops})")
+
+
+class SolverObserver:
+    """
+    Receives callbacks while the solver runs.
+
+    Every method is a no-op, subclasses override the ones they need.
+    When no observer is passed the solver skips the callbacks entirely.
+    """
+
+    def node_relaxed(self, node: GraphNode, distance: float, previous: GraphNode):
+        """A shorter tentative distance to node was found through previous"""
+
+    def node_settled(self, node: GraphNode, distance: float):
+        """The final distance of node is known and its neighbours were relaxed"""
+
+    def target_found(self, node: GraphNode, distance: float):
+        """The target node was reached, the solver stops after this call"""
+
+    def finished(self):
+        """The solver is done"""
+
+
+class GraphListener:
+    """
+    Is told about every structural change of a Graph it is registered with
+    (Graph.listeners). Called after the change was applied, all methods are no-ops.
+    """
+
+    def node_added(self, node: GraphNode):
+        pass
+
+    def node_removed(self, node: GraphNode):
+        """The edges of the node were already removed one by one"""
+
+    def node_moved(self, node: GraphNode):
+        pass
+
+    def edge_added(self, edge: GraphEdge):
+        pass
+
+    def edge_removed(self, edge: GraphEdge):
+        pass
+
+    def edge_value_changed(self, edge: GraphEdge, old_value: int):
+        pass
+
+    def graph_cleared(self):
+        pass
+
+    def graph_replaced(self):
+        """All nodes and edges were swapped for new ones at once (Graph.replace_contents)"""
+        self.graph_cleared()
+
+
+def pair_key(a: GraphNode, b: GraphNode) -> Tuple[GraphNode, GraphNode]:
+    """Key of the unordered node pair a, b in Graph.edge_map"""
+    return (a, b) if id(a) <= id(b) else (b, a)
+
+
+class Graph:
+    # Classes used when building the graph from saved data
+    node_class = GraphNode
+    edge_class = GraphEdge
+
+    def __init__(self):
+        self.nodes: List[GraphNode] = []
+        self.edges: List[GraphEdge] = []
+        # node -> [(neighbor, weight, edge)], kept in sync with nodes/edges
+        self.adjacency: Dict[GraphNode, List[Tuple[GraphNode, int, GraphEdge]]] = {}
+        # Position of every node in nodes. Deleting moves the last node into the gap, so the order can change.
+        self.node_ids: Dict[GraphNode, int] = {}
+        # Unordered node pair (see pair_key) -> the lightest edge between them
+        self.edge_map: Dict[Tuple[GraphNode, GraphNode], GraphEdge] = {}
+        # Number of edges of the pairs that have parallel edges
+        self._parallel_counts: Dict[Tuple[GraphNode, GraphNode], int] = {}
+        # edge -> [position in edges, in adjacency[edge.start], in adjacency[edge.end]], edges are deleted like nodes
+        self._edge_slots: Dict[GraphEdge, List[int]] = {}
+
+        # Preprocessing that is only valid for the current edges, see changed()
+        self.landmarks = None
+        self.hierarchy = None
+        self.distance_matrix = None
+        self._heuristic_scale = None
+
+        # Notified in order over a copy of the list, so a listener may unregister itself (or others) while notified
+        self.listeners: List[GraphListener] = []
+        self._path_tree = None
+        # Union-find over the nodes, grown by additions and rebuilt after deletions (see components)
+        self._components = None
+
+        # Bumped by every mutation, solver results are cached per version (see query_cache.py)
+        self.version = 0
+        self.tree_cache = QueryCache(TREE_CACHE_SIZE)
+        self.path_cache = QueryCache(PATH_CACHE_SIZE)
+
+    def changed(self):
+        """Drops everything derived from the edges or node positions, called by every mutation"""
+        self.version += 1
+        self.landmarks = None
+        self.hierarchy = None
+        self.distance_matrix = None
+        self._heuristic_scale = None
+
+    def node_moved(self, node: GraphNode):
+        """Has to be called after the coordinates of a node were changed"""
+        self._heuristic_scale = None
+        for listener in list(self.listeners):
+            listener.node_moved(node)
+
+    def add_node(self, node: GraphNode, name: str = None):
+        if name is not None:
+            node.name = name
+        elif node.name is None:
+            node.name = self.gen_name()
+        self.node_ids[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.adjacency.setdefault(node, [])
+        if self._components is not None:
+            self._components.add(node)
+        self.changed()
+        for listener in list(self.listeners):
+            listener.node_added(node)
+
+    def add_edge(self, edge: GraphEdge):
+        start, end, value = edge.start, edge.end, edge.value
+        start_entries = self.adjacency.setdefault(start, [])
+        start_entries.append((end, value, edge))
+        # Taken before the second append, so the two halves of a self-loop get different slots
+        start_slot = len(start_entries) - 1
+        end_entries = self.adjacency.setdefault(end, [])
+        end_entries.append((start, value, edge))
+        self._edge_slots[edge] = [len(self.edges), start_slot, len(end_entries) - 1]
+        self.edges.append(edge)
+
+        key = pair_key(start, end)
+        lightest = self.edge_map.get(key)
+        if lightest is None:
+            self.edge_map[key] = edge
+        else:
+            self._parallel_counts[key] = self._parallel_counts.get(key, 1) + 1
+            if value < lightest.value:
+                self.edge_map[key] = edge
+
+        if self._components is not None:
+            self._components.union(start, end)
+        self.changed()
+        for listener in list(self.listeners):
+            listener.edge_added(edge)
+
+    def _remove_adjacency_entry(self, node: GraphNode, slot: int):
+        """Removes adjacency[node][slot] by moving the last entry into its place"""
+        entries = self.adjacency[node]
+        last = entries.pop()
+        if slot == len(entries):
+            return
+        entries[slot] = last
+        slots = self._edge_slots[last[2]]
+        # The moved entry is its edge's start half unless that half is elsewhere (self-loops have both here)
+        side = 1 if last[2].start is node and slots[1] == len(entries) else 2
+        slots[side] = slot
+
+    def remove_edge(self, edge: GraphEdge):
+        """Remove an edge from the graph and from the adjacency index, O(1) unless it has parallel edges"""
+        slots = self._edge_slots[edge]
+        last = self.edges.pop()
+        if slots[0] < len(self.edges):
+            self.edges[slots[0]] = last
+            self._edge_slots[last][0] = slots[0]
+        self._remove_adjacency_entry(edge.start, slots[1])
+        # slots[2] is read after the first removal, which may have moved the other half of a self-loop
+        self._remove_adjacency_entry(edge.end, slots[2])
+        del self._edge_slots[edge]
+
+        key = pair_key(edge.start, edge.end)
+        count = self._parallel_counts.get(key, 1)
+        if count == 1:
+            del self.edge_map[key]
+        else:
+            if count == 2:
+                del self._parallel_counts[key]
+            else:
+                self._parallel_counts[key] = count - 1
+            if self.edge_map[key] is edge:
+                self.edge_map[key] = min(self.edges_between(edge.start, edge.end), key=lambda other: other.value)
+
+        # A union can't be undone, the components are rebuilt when they are needed next
+        self._components = None
+        self.changed()
+        for listener in list(self.listeners):
+            listener.edge_removed(edge)
+
+    def remove_node(self, node: GraphNode):
+        """Remove a node together with all of its edges, O(degree)"""
+        for _, _, edge in list(self.adjacency.get(node, [])):
+            # Self-loops are listed twice
+            if edge in self._edge_slots:
+                self.remove_edge(edge)
+        node_id = self.node_ids.pop(node)
+        last = self.nodes.pop()
+        if node_id < len(self.nodes):
+            self.nodes[node_id] = last
+            self.node_ids[last] = node_id
+        self.adjacency.pop(node, None)
+        self._components = None
+        self.changed()
+        for listener in list(self.listeners):
+            listener.node_removed(node)
+
+    def set_edge_value(self, edge: GraphEdge, value: int):
+        """Change the weight of an edge and update the adjacency index, setting the same weight is not an edit"""
+        old_value = edge.value
+        if value == old_value:
+            return
+        edge.value = value
+        _, start_slot, end_slot = self._edge_slots[edge]
+        self.adjacency[edge.start][start_slot] = (edge.end, value, edge)
+        self.adjacency[edge.end][end_slot] = (edge.start, value, edge)
+
+        key = pair_key(edge.start, edge.end)
+        if key in self._parallel_counts:
+            self.edge_map[key] = min(self.edges_between(edge.start, edge.end), key=lambda other: other.value)
+
+        self.changed()
+        for listener in list(self.listeners):
+            listener.edge_value_changed(edge, old_value)
+
+    def clear(self):
+        """Remove all nodes and edges"""
+        self.nodes.clear()
+        self.edges.clear()
+        self.adjacency.clear()
+        self.node_ids.clear()
+        self.edge_map.clear()
+        self._parallel_counts.clear()
+        self._edge_slots.clear()
+        self._components = None
+        self.changed()
+        for listener in list(self.listeners):
+            listener.graph_cleared()
+
+    def replace_contents(self, other: "Graph"):
+        """
+        Takes over the nodes, edges and preprocessing of other in one step.
+        Used to swap in a graph that was built off to the side, e.g. by a loader thread.
+        """
+        self.nodes = other.nodes
+        self.edges = other.edges
+        self.adjacency = other.adjacency
+        self.node_ids = other.node_ids
+        self.edge_map = other.edge_map
+        self._parallel_counts = other._parallel_counts
+        self._edge_slots = other._edge_slots
+        self._components = other._components
+        self.changed()
+        self.landmarks = other.landmarks
+        self.hierarchy = other.hierarchy
+        for listener in list(self.listeners):
+            listener.graph_replaced()
+
+    @property
+    def components(self) -> DisjointSet:
+        """Connected components of the nodes, built on first use and after deletions"""
+        if self._components is None:
+            self._components = DisjointSet.from_graph(self)
+        return self._components
+
+    def connected(self, a: GraphNode, b: GraphNode) -> bool:
+        """Whether there is a path between a and b, O(alpha(n)) while no edge was deleted"""
+        return self.components.connected(a, b)
+
+    def component_size(self, node: GraphNode) -> int:
+        """Number of nodes reachable from node, itself included"""
+        return self.components.size(node)
+
+    def content_hash(self) -> str:
+        """
+        Hash of the node names and weighted edges, used to match files saved for this graph.
+        Positions are left out on purpose, moving a node doesn't change any distance.
+        """
+        digest = hashlib.sha1()
+        for node in self.nodes:
+            digest.update(f"{node.name}\n".encode())
+        digest.update(b"edges\n")
+        for edge in self.edges:
+            digest.update(f"{edge.start.name}\0{edge.end.name}\0{edge.value}\n".encode())
+        return digest.hexdigest()
+
+    def heuristic_scale(self) -> float:
+        """
+        Largest factor that keeps scale * euclidean distance a lower bound of
+        the path weight, i.e. the smallest weight per pixel over all edges.
+        """
+        if self._heuristic_scale is None:
+            scale = math.inf
+            for edge in self.edges:
+                length = math.dist((edge.start.x, edge.start.y), (edge.end.x, edge.end.y))
+                if length > 0:
+                    scale = min(scale, edge.value / length)
+            self._heuristic_scale = 0.0 if scale == math.inf else scale
+        return self._heuristic_scale
+
+    def get_edge(self, start: GraphNode, end: GraphNode) -> GraphEdge:
+        """Returns the lightest edge between two nodes, or None if they are not connected"""
+        return self.edge_map.get(pair_key(start, end))
+
+    def has_edge(self, start: GraphNode, end: GraphNode) -> bool:
+        return pair_key(start, end) in self.edge_map
+
+    def edges_between(self, start: GraphNode, end: GraphNode) -> List[GraphEdge]:
+        """All edges between two nodes, parallel ones included, O(degree of start)"""
+        if pair_key(start, end) not in self.edge_map:
+            return []
+        edges = [edge for neighbor, _, edge in self.adjacency.get(start, []) if neighbor is end]
+        # A self-loop is listed twice in the adjacency of its node
+        return list(dict.fromkeys(edges)) if start is end else edges
+
+    def gen_name(self):
+        """Next single character name not in use, names identify nodes in saved files and the journal"""
+        names = {node.name for node in self.nodes}
+        code = ord('A') + len(self.nodes)
+        while chr(code) in names:
+            code += 1
+        return chr(code)
+
+    def get_next_nodes(self, node: GraphNode) -> Dict[GraphNode, int]:
+        """
+        Get the next nodes for a given node
+        Returns a dictionary with the next nodes and their weights
+        """
+        return {neighbor: weight for neighbor, weight, _ in self.adjacency.get(node, [])}
+
+    def max_edge_weight(self) -> int:
+        """Returns the heaviest edge weight, the weights must be non-negative integers"""
+        max_weight = 0
+        for edge in self.edges:
+            if not isinstance(edge.value, int) or edge.value < 0:
+                raise ValueError(f"Edge {edge.start.name}-{edge.end.name} has a weight that is not a non-negative integer: {edge.value}")
+            max_weight = max(max_weight, edge.value)
+        return max_weight
+
+    def dijkstra_algorithm(self, start: GraphNode, target: GraphNode = None, observer: SolverObserver = None,
+                           queue: str = "heap", stats: SearchStats = None, cache: bool = True):
+        """
+        Runs Dijkstra's algorithm from start.
+
+        Stops as soon as target is settled when a target is given, otherwise
+        computes the whole shortest path tree. queue picks the priority queue
+        implementation, see priority_queues.make_queue. Settled nodes and
+        relaxed edges are counted into stats. Returns (previous, distances).
+        Full trees computed without observer or stats are cached per graph
+        version unless cache is False; they are shared, so the returned
+        dictionaries must not be modified.
+        """
+        cacheable = cache and target is None and observer is None and stats is None
+        if cacheable:
+            cached = self.tree_cache.get((self.version, start))
+            if cached is not MISSING:
+                return cached
+
+        # Without observer the search never yields, the first next() runs it to the end
+        steps = self._dijkstra_search(start, target, queue, stats, trace=observer is not None)
+        while True:
+            try:
+                step = next(steps)
+            except StopIteration as stop:
+                previous, distances = stop.value
+                break
+            if observer is not None:
+                if step.node is target:
+                    observer.target_found(step.node, step.distance)
+                    continue
+                for neighbor, distance in step.relaxed:
+                    observer.node_relaxed(neighbor, distance, step.node)
+                observer.node_settled(step.node, step.distance)
+
+        if observer is not None:
+            observer.finished()
+
+        if cacheable:
+            self.tree_cache.put((self.version, start), (previous, distances))
+        return previous, distances
+
+    def dijkstra_steps(self, start: GraphNode, target: GraphNode = None, queue: str = "heap", stats: SearchStats = None):
+        """
+        Dijkstra's algorithm as a generator, for callers that want to run it
+        a few steps at a time (the editor animates it between frames).
+
+        Yields a SolverStep for every settled node; the step of target has no
+        relaxed nodes and is the last one. The generator returns
+        (previous, distances) like dijkstra_algorithm, without any step when
+        target is in another component. The graph must not be edited while
+        the generator is unfinished.
+        """
+        return self._dijkstra_search(start, target, queue, stats, trace=True)
+
+    def _dijkstra_search(self, start: GraphNode, target: GraphNode, queue: str, stats: SearchStats, trace: bool):
+        """The loop of dijkstra_algorithm and dijkstra_steps, yields a SolverStep per settled node only with trace"""
+        distances = {node: float('infinity') for node in self.nodes}
+        distances[start] = 0
+        previous = {node: None for node in self.nodes}
+
+        # A target in another component is never reached, don't search the whole component of start for it
+        if target is not None and not self.connected(start, target):
+            return previous, distances
+
+        pq = make_queue(queue, self.max_edge_weight() if queue == "bucket" else None)
+        pq.push(start, 0)
+        if stats is not None:
+            stats.pushes += 1
+
+        visited = set()
+        relaxed = None
+
+        while pq:
+            current_distance, current_node = pq.pop()
+
+            if current_node in visited:
+                if stats is not None:
+                    stats.pops += 1
+                    stats.stale_pops += 1
+                continue
+
+            visited.add(current_node)
+            if stats is not None:
+                stats.pops += 1
+                stats.settled += 1
+
+            if current_node is target:
+                if trace:
+                    yield SolverStep(current_node, current_distance, [])
+                break
+
+            if trace:
+                relaxed = []
+            for neighbor, weight, _ in self.adjacency.get(current_node, []):
+                if neighbor in visited:
+                    continue
+                new_distance = current_distance + weight
+
+                # Update distance if a shorter path is found
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current_node
+                    pq.push(neighbor, new_distance)
+                    if stats is not None:
+                        stats.relaxed += 1
+                        stats.pushes += 1
+                    if trace:
+                        relaxed.append((neighbor, new_distance))
+
+            if trace:
+                yield SolverStep(current_node, current_distance, relaxed)
+
+        if stats is not None:
+            stats.add_queue(pq)
+        return previous, distances
+
+    def shortest_path_tree(self, source: GraphNode, observer: SolverObserver = None):
+        """
+        Returns the maintained shortest path tree of source (see dynamic_sssp.py).
+        Only the tree of the last queried source is kept, it is repaired
+        incrementally on every edit instead of being recomputed.
+        """
+        tree = self._path_tree
+        if tree is None or tree.source is not source:
+            from dynamic_sssp import DynamicShortestPathTree
+            if tree is not None:
+                self.listeners.remove(tree)
+            tree = DynamicShortestPathTree(self, source, observer=observer)
+            self.listeners.append(tree)
+            self._path_tree = tree
+        return tree
+
+    def build_path(self, previous: Dict[GraphNode, GraphNode], distances: Dict[GraphNode, float],
+                   start: GraphNode, end: GraphNode) -> PathResult:
+        """Backtracks from end to start through previous and collects the path nodes and edges"""
+        nodes = []
+        edges = []
+        current_node = end
+
+        while current_node is not None:
+            nodes.append(current_node)
+            previous_node = previous.get(current_node, None)
+            if previous_node is not None:
+                edges.append(self.get_edge(current_node, previous_node))
+            current_node = previous_node
+
+        nodes.reverse()
+        edges.reverse()
+
+        if nodes and nodes[0] is start:
+            return PathResult(nodes, edges, distances[end])
+        return PathResult([], [], None)
+
+    def find_shortest_path(self, start: GraphNode, end: GraphNode, observer: SolverObserver = None,
+                           queue: str = "heap", method: str = "dijkstra", stats: SearchStats = None,
+                           heuristic_scale: float = None) -> PathResult:
+        """
+        Returns the shortest path from start to end as a PathResult.
+
+        method is "dijkstra", "bidirectional", "astar", "alt" (see search.py)
+        or "ch" (see contraction.py). "dynamic" answers from the maintained
+        shortest path tree of start (see dynamic_sssp.py). "apsp" looks the
+        path up in the all-pairs distance matrix, computed or read from its
+        disk cache on first use (see all_pairs.py). "delta" runs the NumPy
+        delta-stepping engine (see delta_stepping.py). heuristic_scale overrides the coordinate
+        scale used by "astar". "alt" and "ch" build self.landmarks and
+        self.hierarchy on first use unless they were loaded with the graph.
+
+        Nodes in different components are rejected at once without a search.
+        Results of queries without observer or stats are cached per graph
+        version, repeating a query on an unchanged graph returns at once.
+        While instrumentation is enabled the uncached queries are recorded.
+        """
+        if not self.connected(start, end):
+            if observer is not None:
+                observer.finished()
+            return PathResult([], [], None)
+
+        if observer is not None or stats is not None:
+            return self._find_shortest_path(start, end, observer, queue, method, stats, heuristic_scale)
+
+        key = self.path_key(start, end, method, heuristic_scale)
+        result = self.path_cache.get(key)
+        if result is MISSING:
+            tree = self.tree_cache.get((self.version, start)) if method == "dijkstra" else MISSING
+            if tree is not MISSING:
+                result = self.build_path(*tree, start, end)
+            elif instrumentation.active() is None:
+                result = self._find_shortest_path(start, end, observer, queue, method, stats, heuristic_scale)
+            else:
+                stats = SearchStats()
+                begin = time.perf_counter()
+                result = self._find_shortest_path(start, end, observer, queue, method, stats, heuristic_scale)
+                instrumentation.active().add_query(method, stats, begin, time.perf_counter())
+            self.path_cache.put(key, result)
+        return result
+
+    def path_key(self, start: GraphNode, end: GraphNode, method: str = "dijkstra", heuristic_scale: float = None) -> tuple:
+        """Key of a query in path_cache, only valid for the current version of the graph"""
+        return self.version, start, end, method, heuristic_scale
+
+    def _find_shortest_path(self, start: GraphNode, end: GraphNode, observer: SolverObserver, queue: str,
+                            method: str, stats: SearchStats, heuristic_scale: float) -> PathResult:
+        if method == "dijkstra":
+            previous, distances = self.dijkstra_algorithm(start, target=end, observer=observer, queue=queue, stats=stats)
+            return self.build_path(previous, distances, start, end)
+
+        import search
+        if method == "bidirectional":
+            return search.bidirectional_dijkstra(self, start, end, observer=observer, queue=queue, stats=stats)
+        if method == "astar":
+            return search.astar(self, start, end, observer=observer, queue=queue, stats=stats, scale=heuristic_scale)
+        if method == "alt":
+            if self.landmarks is None:
+                from landmarks import Landmarks
+                self.landmarks = Landmarks.build(self)
+            return search.alt(self, start, end, self.landmarks, observer=observer, queue=queue, stats=stats)
+        if method == "ch":
+            if self.hierarchy is None:
+                from contraction import ContractionHierarchy
+                self.hierarchy = ContractionHierarchy.build(self)
+            return self.hierarchy.query(start, end, stats=stats)
+        if method == "dynamic":
+            return self.shortest_path_tree(start, observer=observer).path_to(end)
+        if method == "delta":
+            from delta_stepping import delta_stepping
+            previous, distances = delta_stepping(self, start)
+            return self.build_path(previous, distances, start, end)
+        if method == "apsp":
+            if self.distance_matrix is None:
+                from all_pairs import all_pairs
+                self.distance_matrix = all_pairs(self)
+            path = [self.nodes[i] for i in self.distance_matrix.path(self.node_ids[start], self.node_ids[end])]
+            if not path:
+                return PathResult([], [], None)
+            edges = [self.get_edge(node, next_node) for node, next_node in zip(path, path[1:])]
+            return PathResult(path, edges, self.distance_matrix.distance(path[0], path[-1]))
+        raise ValueError(f"Unknown search method: {method}")
@@ -0,0 +1,164 @@
+"""
+Opt-in instrumentation of the solvers and the editor loop.
+
+Nothing is measured until enable() is called. While it is off, phase()
+hands out one shared do-nothing context manager and active() returns None,
+so instrumented code costs a function call and a None check.
+
+Once enabled, phases (event handling, drawing, loading, saving, ...) are
+timed and every solver query records the counters of its SearchStats. The
+results are available as a summary dictionary, as JSON and as a Chrome trace
+that chrome://tracing or https://ui.perfetto.dev can open.
+
+    instrumentation.enable()
+    with instrumentation.phase("draw_game"):
+        ...
+    instrumentation.active().write_chrome_trace("profile_trace.json")
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Trace events kept for the export, the oldest are dropped first
+MAX_TRACE_EVENTS = 200000
+
+QUERY_COUNTERS = ("pushes", "pops", "stale_pops", "relaxed", "settled")
+
+_active = None
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    def __init__(self, instrumentation: "Instrumentation", name: str):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.add_phase(self.name, self.begin, time.perf_counter())
+        return False
+
+
+class Instrumentation:
+    def __init__(self, max_events: int = MAX_TRACE_EVENTS):
+        self.started = time.perf_counter()
+        # name -> {'count', 'total', 'max', 'last'} in seconds
+        self.phases = {}
+        # method -> {'count', 'seconds', counters...}, last_query is the most recent one
+        self.queries = {}
+        self.last_query = None
+        self.events = deque(maxlen=max_events)
+        # Loads and saves report from worker threads
+        self._lock = threading.Lock()
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def _event(self, name: str, category: str, begin: float, end: float, args: dict = None):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (begin - self.started) * 1e6,
+            'dur': (end - begin) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def add_phase(self, name: str, begin: float, end: float):
+        seconds = end - begin
+        with self._lock:
+            phase = self.phases.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+            phase['count'] += 1
+            phase['total'] += seconds
+            phase['max'] = max(phase['max'], seconds)
+            phase['last'] = seconds
+            self._event(name, 'phase', begin, end)
+
+    def add_query(self, method: str, stats, begin: float, end: float):
+        """Records one solver query, stats is the SearchStats it filled in"""
+        counters = {counter: getattr(stats, counter) for counter in QUERY_COUNTERS}
+        with self._lock:
+            query = self.queries.setdefault(method, {'count': 0, 'seconds': 0.0, **dict.fromkeys(QUERY_COUNTERS, 0)})
+            query['count'] += 1
+            query['seconds'] += end - begin
+            for counter, value in counters.items():
+                query[counter] += value
+            self.last_query = {'method': method, 'seconds': end - begin, **counters}
+            self._event(method, 'query', begin, end, counters)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'phases': {name: {**phase, 'mean': phase['total'] / phase['count']} for name, phase in self.phases.items()},
+                'queries': {method: dict(query) for method, query in self.queries.items()},
+                'last_query': self.last_query,
+            }
+
+    def overlay_text(self) -> str:
+        """One line for the editor: the last frame's phases and the counters of the last query"""
+        with self._lock:
+            parts = [f"{name} {phase['last'] * 1000:.1f} ms" for name, phase in self.phases.items()
+                     if name in ("frame", "event_handler", "render")]
+            query = self.last_query
+        if query is not None:
+            parts.append(f"{query['method']}: settled {query['settled']} relaxed {query['relaxed']} "
+                         f"pushes {query['pushes']} pops {query['pops']} stale {query['stale_pops']}")
+        return " | ".join(parts)
+
+    def to_chrome_trace(self) -> dict:
+        with self._lock:
+            return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+
+def enable() -> Instrumentation:
+    """Starts instrumenting, keeps the running instrumentation when there is one"""
+    global _active
+    if _active is None:
+        _active = Instrumentation()
+    return _active
+
+
+def disable() -> Instrumentation:
+    """Stops instrumenting and returns what was recorded"""
+    global _active
+    instrumentation, _active = _active, None
+    return instrumentation
+
+
+def active() -> Instrumentation:
+    """The running instrumentation, None while it is disabled"""
+    return _active
+
+
+def phase(name: str):
+    """Context manager timing the phase name, free while instrumentation is disabled"""
+    if _active is None:
+        return _NO_PHASE
+    return _Phase(_active, name)
@@ -0,0 +1,239 @@
+"""
+Append-only journal of graph edits for incremental autosave.
+
+Every edit is appended as one JSON line to <graph>.journal.jsonl, so saving
+costs as much as the edit, not the graph. Now and then the journal is
+compacted: the graph is written to <graph>.snapshot.json by a background
+thread and the journal lines it covers are dropped. Recovery loads the
+snapshot and replays the journal lines written after it.
+
+Lines carry increasing sequence numbers and the snapshot records the last
+one it includes. Compaction first moves the journal aside to
+<graph>.journal.jsonl.old and continues in a fresh file, and only deletes
+the old file after the snapshot was atomically replaced, so a crash at any
+point leaves a snapshot plus journal lines that replay to the last edit.
+"""
+import json
+import os
+import threading
+import time
+
+from graph_core import GraphEdge, GraphListener, GraphNode
+
+# Compact after this many journal lines, or after AUTOSAVE_INTERVAL seconds with any edits
+COMPACT_EVERY = 5000
+AUTOSAVE_INTERVAL = 60
+
+
+def journal_paths(path: str):
+    """(journal, moved aside journal, snapshot) file paths of the graph file at path"""
+    root, _ = os.path.splitext(path)
+    return f"{root}.journal.jsonl", f"{root}.journal.jsonl.old", f"{root}.snapshot.json"
+
+
+def _find_edge(graph, start: GraphNode, end: GraphNode, value=None):
+    """The edge between two nodes, preferring one with the given value among parallel edges"""
+    edge = graph.get_edge(start, end)
+    if edge is None or value is None or edge.value == value:
+        return edge
+    return next((other for other in graph.edges_between(start, end) if other.value == value), edge)
+
+
+def _apply(graph, entry: dict, nodes: dict):
+    """Replays one journal entry, nodes maps names to the nodes of graph"""
+    op = entry['op']
+    if op == 'add_node':
+        node = graph.node_class.from_dict(entry['node'])
+        graph.add_node(node)
+        nodes[node.name] = node
+    elif op == 'move_node':
+        node = nodes[entry['name']]
+        node.x, node.y = entry['x'], entry['y']
+        graph.node_moved(node)
+    elif op == 'remove_node':
+        graph.remove_node(nodes.pop(entry['name']))
+    elif op == 'set_root':
+        nodes[entry['name']].root = entry['root']
+    elif op == 'add_edge':
+        graph.add_edge(graph.edge_class.from_dict(entry['edge'], nodes))
+    elif op == 'remove_edge':
+        graph.remove_edge(_find_edge(graph, nodes[entry['start']], nodes[entry['end']], entry['value']))
+    elif op == 'set_value':
+        graph.set_edge_value(_find_edge(graph, nodes[entry['start']], nodes[entry['end']], entry['old']), entry['value'])
+    elif op == 'clear':
+        graph.clear()
+        nodes.clear()
+    else:
+        raise ValueError(f"Unknown journal operation {op!r}")
+
+
+def _replay(graph, path: str, after: int, nodes: dict) -> int:
+    """Applies the entries of a journal file with a sequence number above after, returns the last one"""
+    last = after
+    try:
+        f = open(path, 'r')
+    except OSError:
+        return last
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn last line of a crashed session
+            if entry['seq'] > last:
+                _apply(graph, entry, nodes)
+                last = entry['seq']
+    return last
+
+
+def recover(graph, path: str) -> int:
+    """
+    Rebuilds graph from the snapshot and journal of the graph file at path.
+    Returns the sequence number of the last replayed edit, 0 when nothing was saved.
+    """
+    from saving import load_graph
+
+    journal, old_journal, snapshot = journal_paths(path)
+    graph.clear()
+    seq = 0
+    if os.path.exists(snapshot):
+        load_graph(graph, snapshot)
+        with open(snapshot, 'r') as f:
+            seq = json.load(f).get('journal_seq', 0)
+
+    nodes = {node.name: node for node in graph.nodes}
+    seq = _replay(graph, old_journal, seq, nodes)
+    return _replay(graph, journal, seq, nodes)
+
+
+class EditJournal(GraphListener):
+    """
+    Listens to a graph and appends every edit to its journal. Root toggles
+    are plain attribute changes, the editor reports them with root_changed.
+    Call tick once per frame: it flushes the journal and starts a compaction
+    when one is due.
+    """
+
+    def __init__(self, graph, path: str, seq: int = 0):
+        self.graph = graph
+        self.path = path
+        self.journal_path, self.old_journal_path, self.snapshot_path = journal_paths(path)
+        self.seq = seq
+
+        self._file = open(self.journal_path, 'a')
+        self._lines = 0
+        self._last_compaction = time.monotonic()
+        self._compaction = None
+        # Drags move a node on every mouse motion, only its last position is written
+        self._pending_move = None
+
+    @classmethod
+    def open(cls, graph, path: str) -> "EditJournal":
+        """Recovers graph from the journal of path and starts journaling its edits"""
+        journal = cls(graph, path, recover(graph, path))
+        graph.listeners.append(journal)
+        return journal
+
+    def _write(self, op: str, **fields):
+        if self._pending_move is not None and op != 'move_node':
+            self._write_move()
+        self.seq += 1
+        self._file.write(json.dumps({'seq': self.seq, 'op': op, **fields}, separators=(',', ':')) + "\n")
+        self._lines += 1
+
+    def _write_move(self):
+        node, self._pending_move = self._pending_move, None
+        self._write('move_node', name=node.name, x=node.x, y=node.y)
+
+    def root_changed(self, node: GraphNode):
+        self._write('set_root', name=node.name, root=bool(node.root))
+
+    def flush(self):
+        if self._pending_move is not None:
+            self._write_move()
+        self._file.flush()
+
+    def tick(self):
+        """Flushes the edits of this frame and compacts the journal when it is due"""
+        self.flush()
+        if self._compaction is not None and not self._compaction.is_alive():
+            self._compaction = None
+        due = self._lines >= COMPACT_EVERY or (self._lines and time.monotonic() - self._last_compaction >= AUTOSAVE_INTERVAL)
+        if due and self._compaction is None:
+            self.compact()
+
+    def compact(self, wait: bool = False):
+        """Writes a snapshot of the graph in a background thread and drops the journal lines it covers"""
+        self.flush()
+        if self._compaction is not None:
+            self._compaction.join()
+
+        # The snapshot data is taken on this thread, the graph may change while the thread writes
+        data = {
+            'nodes': [node.to_dict() for node in self.graph.nodes],
+            'edges': [edge.to_dict() for edge in self.graph.edges],
+            'journal_seq': self.seq,
+        }
+        self._file.close()
+        if os.path.exists(self.old_journal_path):
+            # A previous compaction did not finish, its lines are not in any snapshot yet
+            with open(self.journal_path, 'r') as source, open(self.old_journal_path, 'a') as target:
+                target.write(source.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.old_journal_path)
+        self._file = open(self.journal_path, 'a')
+        self._lines = 0
+        self._last_compaction = time.monotonic()
+
+        self._compaction = threading.Thread(target=self._write_snapshot, args=(data,), daemon=True)
+        self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def _write_snapshot(self, data: dict):
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, 'w') as f:
+            json.dump(data, f)
+        os.replace(temporary, self.snapshot_path)
+        os.remove(self.old_journal_path)
+
+    def close(self):
+        """Flushes outstanding edits and waits for a running compaction"""
+        self.flush()
+        if self._compaction is not None:
+            self._compaction.join()
+        self._file.close()
+        if self in self.graph.listeners:
+            self.graph.listeners.remove(self)
+
+    # GraphListener
+
+    def node_added(self, node: GraphNode):
+        self._write('add_node', node=node.to_dict())
+
+    def node_removed(self, node: GraphNode):
+        self._write('remove_node', name=node.name)
+
+    def node_moved(self, node: GraphNode):
+        if self._pending_move is not None and self._pending_move is not node:
+            self._write_move()
+        self._pending_move = node
+
+    def edge_added(self, edge: GraphEdge):
+        self._write('add_edge', edge=edge.to_dict())
+
+    def edge_removed(self, edge: GraphEdge):
+        self._write('remove_edge', start=edge.start.name, end=edge.end.name, value=edge.value)
+
+    def edge_value_changed(self, edge: GraphEdge, old_value: int):
+        self._write('set_value', start=edge.start.name, end=edge.end.name, old=old_value, value=edge.value)
+
+    def graph_cleared(self):
+        self._pending_move = None
+        self._write('clear')
+
+    def graph_replaced(self):
+        # Journaling every node of a loaded graph would cost as much as a snapshot, so take one
+        self._pending_move = None
+        self.compact()
@@ -0,0 +1,89 @@
+"""
+Landmark distance tables for ALT search (A*, Landmarks, Triangle inequality).
+
+For every landmark L the exact distance d(L, v) to every node is stored.
+In an undirected graph |d(L, t) - d(L, v)| <= d(v, t), so the largest of
+these differences over all landmarks is an admissible lower bound.
+"""
+import math
+from typing import Dict, List, Tuple
+
+from graph_core import GraphNode
+
+LANDMARK_COUNT = 8
+
+
+class Landmarks:
+    def __init__(self, landmarks: List[GraphNode], distances: Dict[GraphNode, Tuple[float, ...]], fingerprint: str = None):
+        self.landmarks = landmarks
+        # node -> distance from every landmark, math.inf when unreachable
+        self.distances = distances
+        # Graph.content_hash() of the graph the table was computed for
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, graph, count: int = LANDMARK_COUNT) -> "Landmarks":
+        """
+        Picks landmarks by farthest selection and runs one full Dijkstra per landmark.
+
+        The first landmark is the node farthest from the first node, every next
+        one is the node farthest from all landmarks chosen so far. Nodes that no
+        landmark reaches are picked first, so every component gets a landmark.
+        """
+        landmarks = []
+        columns = []
+        if not graph.nodes:
+            return cls(landmarks, {}, graph.content_hash())
+
+        _, seed_distances = graph.dijkstra_algorithm(graph.nodes[0], cache=False)
+        candidate = max(graph.nodes, key=seed_distances.get)
+        closest = {node: math.inf for node in graph.nodes}
+
+        while len(landmarks) < count:
+            _, distances = graph.dijkstra_algorithm(candidate, cache=False)
+            landmarks.append(candidate)
+            columns.append(distances)
+            for node in graph.nodes:
+                closest[node] = min(closest[node], distances[node])
+
+            candidate = max(graph.nodes, key=closest.get)
+            if closest[candidate] == 0:
+                break
+
+        table = {node: tuple(column[node] for column in columns) for node in graph.nodes}
+        return cls(landmarks, table, graph.content_hash())
+
+    def lower_bound(self, node: GraphNode, target_distances: Tuple[float, ...]) -> float:
+        """Largest triangle inequality bound of d(node, target) over all landmarks"""
+        node_distances = self.distances.get(node)
+        if node_distances is None:
+            return 0
+        best = 0
+        for from_landmark, to_target in zip(node_distances, target_distances):
+            if from_landmark == math.inf or to_target == math.inf:
+                continue
+            bound = abs(to_target - from_landmark)
+            if bound > best:
+                best = bound
+        return best
+
+    def to_dict(self) -> dict:
+        """JSON friendly form keyed by node names, unreachable distances become None"""
+        return {
+            'fingerprint': self.fingerprint,
+            'landmarks': [node.name for node in self.landmarks],
+            'distances': {
+                node.name: [None if distance == math.inf else distance for distance in distances]
+                for node, distances in self.distances.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, graph) -> "Landmarks":
+        """Rebuilds the table for the nodes of graph from to_dict output"""
+        node_map = {node.name: node for node in graph.nodes}
+        distances = {
+            node_map[name]: tuple(math.inf if distance is None else distance for distance in row)
+            for name, row in data['distances'].items() if name in node_map
+        }
+        return cls([node_map[name] for name in data['landmarks']], distances, data.get('fingerprint'))
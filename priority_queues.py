@@ -0,0 +1,254 @@
+"""
+Priority queues for the shortest path solvers.
+
+All queues share the same small interface:
+
+    push(item, priority)   insert item, or lower its priority if it is queued
+    pop() -> (priority, item)
+    peek() -> (priority, item) without removing it
+    len(queue), bool(queue)
+    stale                  outdated entries skipped by pop() and peek() so far
+
+Items only need to be hashable, they are never compared with each other, so
+ties between equal distances don't fall back to Node.__lt__. None of the
+queues take a lock, they are meant to be used by a single solver at a time.
+"""
+from heapq import heappush, heappop
+
+
+class HeapQueue:
+    """
+    Binary heap from heapq with lazy deletion.
+
+    Lowering the priority of an item pushes a new entry, the outdated entry
+    stays in the heap and is skipped when it is popped.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}  # item -> (priority, sequence) of its current entry
+        self._sequence = 0
+        self.stale = 0
+
+    def push(self, item, priority):
+        live = self._live.get(item)
+        if live is not None and live[0] <= priority:
+            return
+        self._sequence += 1
+        self._live[item] = (priority, self._sequence)
+        heappush(self._heap, (priority, self._sequence, item))
+
+    def pop(self):
+        heap = self._heap
+        live = self._live
+        while heap:
+            priority, sequence, item = heappop(heap)
+            entry = live.get(item)
+            if entry is not None and entry[1] == sequence:
+                del live[item]
+                return priority, item
+            self.stale += 1
+        raise IndexError("pop from an empty priority queue")
+
+    def peek(self):
+        heap = self._heap
+        live = self._live
+        while heap:
+            priority, sequence, item = heap[0]
+            entry = live.get(item)
+            if entry is not None and entry[1] == sequence:
+                return priority, item
+            heappop(heap)
+            self.stale += 1
+        raise IndexError("peek into an empty priority queue")
+
+    def __len__(self):
+        return len(self._live)
+
+
+class IndexedHeap:
+    """
+    Indexed d-ary heap with a real decrease-key.
+
+    Every item is stored exactly once, its position in the heap is tracked so
+    a lower priority moves the existing entry up instead of adding a new one.
+    arity=2 is a binary heap, higher arities make the heap shallower which
+    favours graphs with many decrease-key operations.
+    """
+
+    # There are no outdated entries to skip
+    stale = 0
+
+    def __init__(self, arity: int = 2):
+        if arity < 2:
+            raise ValueError("The heap arity must be at least 2!")
+        self.arity = arity
+        self._keys = []
+        self._items = []
+        self._position = {}  # item -> index in _keys/_items
+
+    def push(self, item, priority):
+        position = self._position.get(item)
+        if position is None:
+            self._keys.append(priority)
+            self._items.append(item)
+            self._sift_up(len(self._keys) - 1, priority, item)
+        elif priority < self._keys[position]:
+            self._sift_up(position, priority, item)
+
+    decrease_key = push
+
+    def pop(self):
+        keys = self._keys
+        items = self._items
+        if not keys:
+            raise IndexError("pop from an empty priority queue")
+
+        top_priority, top_item = keys[0], items[0]
+        del self._position[top_item]
+
+        last_priority = keys.pop()
+        last_item = items.pop()
+        if keys:
+            self._sift_down(0, last_priority, last_item)
+
+        return top_priority, top_item
+
+    def peek(self):
+        if not self._keys:
+            raise IndexError("peek into an empty priority queue")
+        return self._keys[0], self._items[0]
+
+    def __contains__(self, item):
+        return item in self._position
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _sift_up(self, index: int, priority, item):
+        """Moves the hole at index up until priority fits and places item there"""
+        keys, items, position = self._keys, self._items, self._position
+        arity = self.arity
+        while index > 0:
+            parent = (index - 1) // arity
+            if keys[parent] <= priority:
+                break
+            keys[index] = keys[parent]
+            items[index] = items[parent]
+            position[items[index]] = index
+            index = parent
+        keys[index] = priority
+        items[index] = item
+        position[item] = index
+
+    def _sift_down(self, index: int, priority, item):
+        """Moves the hole at index down until priority fits and places item there"""
+        keys, items, position = self._keys, self._items, self._position
+        arity = self.arity
+        size = len(keys)
+        while True:
+            first_child = arity * index + 1
+            if first_child >= size:
+                break
+            smallest = first_child
+            for child in range(first_child + 1, min(first_child + arity, size)):
+                if keys[child] < keys[smallest]:
+                    smallest = child
+            if keys[smallest] >= priority:
+                break
+            keys[index] = keys[smallest]
+            items[index] = items[smallest]
+            position[items[index]] = index
+            index = smallest
+        keys[index] = priority
+        items[index] = item
+        position[item] = index
+
+
+class BucketQueue:
+    """
+    Dial's bucket queue for small non-negative integer priorities.
+
+    Keeps max_weight + 1 circular buckets. This works because in Dijkstra
+    every queued distance lies between the last popped distance and that
+    distance plus the heaviest edge. Pops must therefore be monotone.
+    Lowering a priority leaves a stale entry behind which is skipped later.
+    """
+
+    def __init__(self, max_weight: int):
+        if max_weight < 0:
+            raise ValueError("Bucket queues need non-negative weights!")
+        self._size = max_weight + 1
+        self._buckets = [[] for _ in range(self._size)]
+        self._priority = {}  # item -> current priority
+        self._current = 0
+        self.stale = 0
+
+    def push(self, item, priority):
+        if priority < self._current or priority - self._current >= self._size:
+            raise ValueError(f"Priority {priority} is outside of the bucket range starting at {self._current}")
+        old_priority = self._priority.get(item)
+        if old_priority is not None and old_priority <= priority:
+            return
+        self._priority[item] = priority
+        self._buckets[priority % self._size].append(item)
+
+    def pop(self):
+        if not self._priority:
+            raise IndexError("pop from an empty priority queue")
+
+        buckets = self._buckets
+        size = self._size
+        while True:
+            bucket = buckets[self._current % size]
+            while bucket:
+                item = bucket.pop()
+                if self._priority.get(item) == self._current:
+                    del self._priority[item]
+                    return self._current, item
+                self.stale += 1
+            self._current += 1
+
+    def peek(self):
+        if not self._priority:
+            raise IndexError("peek into an empty priority queue")
+
+        buckets = self._buckets
+        size = self._size
+        while True:
+            bucket = buckets[self._current % size]
+            while bucket:
+                item = bucket[-1]
+                if self._priority.get(item) == self._current:
+                    return self._current, item
+                bucket.pop()
+                self.stale += 1
+            self._current += 1
+
+    def __len__(self):
+        return len(self._priority)
+
+
+QUEUE_KINDS = ("heap", "indexed", "dary", "bucket")
+
+
+def make_queue(kind: str = "heap", max_weight: int = None):
+    """
+    Creates a priority queue by name.
+
+    "heap"     heapq with lazy deletion
+    "indexed"  indexed binary heap with decrease-key
+    "dary"     indexed 4-ary heap with decrease-key
+    "bucket"   Dial's bucket queue, needs max_weight (largest integer edge weight)
+    """
+    if kind == "heap":
+        return HeapQueue()
+    if kind == "indexed":
+        return IndexedHeap(arity=2)
+    if kind == "dary":
+        return IndexedHeap(arity=4)
+    if kind == "bucket":
+        if max_weight is None:
+            raise ValueError("The bucket queue needs the largest edge weight!")
+        return BucketQueue(max_weight)
+    raise ValueError(f"Unknown priority queue: {kind}, expected one of {QUEUE_KINDS}")
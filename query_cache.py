@@ -0,0 +1,60 @@
+"""
+Bounded LRU caches for solver results.
+
+Graph keeps one cache of full shortest path trees keyed by
+(version, source) and one of point-to-point results keyed by
+(version, source, target, method). Graph.version goes up on every edit, so
+entries of an older graph are never hit again and simply age out of the LRU.
+Cached results are shared between callers and must not be modified.
+"""
+from collections import OrderedDict
+
+# Trees hold two entries per node, so only a few of them are kept
+TREE_CACHE_SIZE = 8
+PATH_CACHE_SIZE = 1024
+
+# Returned by QueryCache.get on a miss, None can be a cached value
+MISSING = object()
+
+
+class QueryCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value of key, MISSING when there is none"""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {'size': len(self._items), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def __repr__(self):
+        return f"QueryCache(size={len(self._items)}/{self.max_size}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
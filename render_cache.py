@@ -0,0 +1,76 @@
+"""
+Caches for the surfaces drawn every frame.
+
+Rendering text and anti-aliased circles is by far the most expensive part of
+draw_game, yet almost nothing changes between frames. Text surfaces are kept
+in an LRU keyed by (text, font, color) and node circles are pre-rendered once
+per (radius, fill, border color) and only blitted afterwards.
+"""
+from collections import OrderedDict
+
+import pygame
+from pygame import gfxdraw
+
+TEXT_CACHE_SIZE = 4096
+SPRITE_CACHE_SIZE = 256
+
+# Set to False to render everything from scratch, used to measure the gain
+CACHE_ENABLED = True
+
+
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, create):
+        """Returns the cached value of key, calling create() to make it on a miss"""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            value = create()
+            self._items[key] = value
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return value
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+text_cache = LRUCache(TEXT_CACHE_SIZE)
+sprite_cache = LRUCache(SPRITE_CACHE_SIZE)
+
+
+def render_text(text: str, font, color) -> pygame.Surface:
+    """font.render(text, True, color) through the text cache"""
+    if not CACHE_ENABLED:
+        return font.render(text, True, color)
+    return text_cache.get((text, font, color), lambda: font.render(text, True, color))
+
+
+def _make_node_sprite(radius: int, color, border_color) -> pygame.Surface:
+    """Draws the node circle exactly like Node.draw used to, centered in a transparent surface"""
+    center = radius + 2
+    sprite = pygame.Surface((2 * center + 1, 2 * center + 1), pygame.SRCALPHA)
+    gfxdraw.filled_circle(sprite, center, center, radius, color)
+    gfxdraw.aacircle(sprite, center, center, radius - 1, color)
+    gfxdraw.aacircle(sprite, center, center, radius, border_color)
+    gfxdraw.aacircle(sprite, center, center, radius + 1, border_color)
+    return sprite
+
+
+def node_sprite(radius: int, color, border_color) -> pygame.Surface:
+    """Pre-rendered node circle, blit it at (x - radius - 2, y - radius - 2)"""
+    if not CACHE_ENABLED:
+        return _make_node_sprite(radius, color, border_color)
+    return sprite_cache.get((radius, color, border_color), lambda: _make_node_sprite(radius, color, border_color))
@@ -0,0 +1,178 @@
+"""
+Layered rendering with dirty rectangles.
+
+Everything that does not follow the mouse is drawn once into a background
+surface, which is only rebuilt when the graph or the look of an item changes.
+The few items that do follow the mouse (hovered and dragged nodes, the edges
+of a dragged node and the "Connect" rubber band) are the foreground: on a
+mouse motion only the rectangles they covered on the last frame are restored
+from the background, the foreground is drawn again and just those rectangles
+are passed to pygame.display.update. Frames without events draw nothing.
+"""
+from typing import List, Set
+
+import pygame
+
+from config import BLACK, WHITE
+from graph_core import GraphEdge, GraphListener, GraphNode
+from render_cache import render_text
+import variables
+
+
+class Renderer(GraphListener):
+    def __init__(self, graph, buttons: list):
+        self.graph = graph
+        self.buttons = buttons
+        # Shown at the bottom of the window, e.g. the distance of the last solve
+        self.score = None
+        # Short line below the buttons, e.g. the progress of a background load
+        self.status = None
+        # Instrumentation summary drawn next to the score, see instrumentation.py
+        self.overlay = None
+
+        # The window is opened by the first renderer
+        self.screen = variables.screen
+        self.background = pygame.Surface(self.screen.get_size())
+        self.background_dirty = True
+        self.needs_redraw = True
+
+        # Items left out of the background and drawn on every redraw
+        self.foreground_nodes: Set[GraphNode] = set()
+        self.foreground_edges: Set[GraphEdge] = set()
+        # Nodes waiting for a second node to connect to, found while rebuilding the background
+        self.connect_nodes: Set[GraphNode] = set()
+        # Screen areas the foreground covered on the last frame
+        self._foreground_rects: List[pygame.Rect] = []
+
+    def invalidate(self):
+        """Rebuilds the background on the next frame, for anything that changed the look of the graph"""
+        self.background_dirty = True
+        self.needs_redraw = True
+
+    def request_redraw(self):
+        """Redraws only the foreground on the next frame"""
+        self.needs_redraw = True
+
+    def set_score(self, score):
+        if score != self.score:
+            self.score = score
+            self.invalidate()
+
+    def set_status(self, status: str):
+        if status != self.status:
+            self.status = status
+            self.request_redraw()
+
+    def set_overlay(self, overlay: str):
+        if overlay != self.overlay:
+            self.overlay = overlay
+            self.request_redraw()
+
+    def track(self, hovered: Set[GraphNode], dragged: GraphNode = None):
+        """Moves the hovered nodes, the dragged node and its edges to the foreground"""
+        nodes = set(hovered) | self.connect_nodes
+        edges = set()
+        if dragged is not None:
+            nodes.add(dragged)
+            edges = {edge for _, _, edge in self.graph.adjacency.get(dragged, [])}
+
+        # Items entering or leaving the foreground have to be added to or removed from the background
+        if nodes != self.foreground_nodes or edges != self.foreground_edges:
+            self.foreground_nodes = nodes
+            self.foreground_edges = edges
+            self.invalidate()
+        self.request_redraw()
+
+    def _rebuild_background(self):
+        surface = self.background
+        surface.fill(WHITE)
+
+        if self.score is not None:
+            width, height = surface.get_size()
+            score_text = render_text(f"Score: {self.score}", variables.SCORE_FONT, BLACK)
+            surface.blit(score_text, (width // 2 - score_text.get_width() // 2, height - score_text.get_height() - 10))
+
+        for edge in self.graph.edges:
+            if edge not in self.foreground_edges:
+                edge.draw(surface)
+
+        self.foreground_nodes -= self.connect_nodes
+        self.connect_nodes = {node for node in self.graph.nodes if node.action == "Connect"}
+        self.foreground_nodes |= self.connect_nodes
+        for node in self.graph.nodes:
+            if node not in self.foreground_nodes:
+                node.draw(surface, connect_line=False)
+
+        self.background_dirty = False
+
+    def _draw_foreground(self) -> List[pygame.Rect]:
+        rects = [edge.draw() for edge in self.foreground_edges]
+        rects.extend(node.draw() for node in self.foreground_nodes)
+        rects.extend(button.draw() for button in self.buttons)
+        if self.status:
+            left, bottom = (self.buttons[-1].x, self.buttons[-1].y + self.buttons[-1].height) if self.buttons else (0, 0)
+            rects.append(self.screen.blit(render_text(self.status, variables.FONT, BLACK), (left, bottom + 10)))
+        if self.overlay:
+            rects.append(self._draw_overlay())
+        return rects
+
+    def _draw_overlay(self) -> pygame.Rect:
+        # The text changes every refresh, it is not worth a place in the render cache
+        text = variables.FONT.render(self.overlay, True, BLACK)
+        width, height = self.screen.get_size()
+        left = width // 2
+        if self.score is not None:
+            left += render_text(f"Score: {self.score}", variables.SCORE_FONT, BLACK).get_width() // 2 + 20
+        return self.screen.blit(text, (left, height - text.get_height() - 20))
+
+    def render(self):
+        """Draws what changed since the last frame and updates only that part of the window"""
+        if not self.needs_redraw:
+            return
+        self.needs_redraw = False
+
+        if self.background_dirty:
+            self._rebuild_background()
+            self.screen.blit(self.background, (0, 0))
+            self._foreground_rects = self._draw_foreground()
+            pygame.display.update()
+            return
+
+        dirty = self._foreground_rects
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+        self._foreground_rects = self._draw_foreground()
+        pygame.display.update(dirty + self._foreground_rects)
+
+    # GraphListener
+
+    def node_added(self, node: GraphNode):
+        self.invalidate()
+
+    def node_removed(self, node: GraphNode):
+        self.foreground_nodes.discard(node)
+        self.connect_nodes.discard(node)
+        self.invalidate()
+
+    def node_moved(self, node: GraphNode):
+        # A dragged node and its edges are already in the foreground
+        if node in self.foreground_nodes and all(edge in self.foreground_edges for _, _, edge in self.graph.adjacency.get(node, [])):
+            self.request_redraw()
+        else:
+            self.invalidate()
+
+    def edge_added(self, edge: GraphEdge):
+        self.invalidate()
+
+    def edge_removed(self, edge: GraphEdge):
+        self.foreground_edges.discard(edge)
+        self.invalidate()
+
+    def edge_value_changed(self, edge: GraphEdge, old_value: int):
+        self.invalidate()
+
+    def graph_cleared(self):
+        self.foreground_nodes = set()
+        self.foreground_edges = set()
+        self.connect_nodes = set()
+        self.invalidate()
@@ -1,53 +1,416 @@
+import csv
+import gzip
 import json
-from dijkstra_parts import *
-from variables import *
+import os
+import time
+from array import array
 
-def save_graph(graph):
-    # Convert the graph to a dictionary
-    graph_data = {
-        'nodes': [node.to_dict() for node in graph.nodes],
-        'edges': [edge.to_dict() for edge in graph.edges]
-    }
-    
-    # Save the graph data to a JSON file
-    with open(SAVE_PATH, 'w') as f:
-        json.dump(graph_data, f, indent=4)
+import numpy as np
 
-    print("Graph saved to graph.json")
+import config
+from landmarks import Landmarks
+from contraction import ContractionHierarchy
+from compact_graph import CompactGraph
+from binary_graph import BINARY_EXTENSION, is_binary, read_binary, write_binary
+from instrumentation import phase
 
+# Bytes read at a time by load_graph, progress is reported after each chunk
+LOAD_CHUNK_BYTES = 1 << 20
 
-def load_graph(graph):
 
-    graph.nodes.clear()
-    graph.edges.clear()
+def save_graph(graph, path: str = None):
+    """Saves the graph as JSON, or in the binary format when path ends with BINARY_EXTENSION"""
+    prepare_save(graph, path)()
 
-    with open(LOAD_PATH, 'r') as f:
-        graph_data = json.load(f)
 
-    # Create a new Graph instance
+def prepare_save(graph, path: str = None):
+    """
+    Copies what save_graph needs out of graph and returns a function that
+    writes it to path (config.SAVE_PATH by default). The function never touches
+    graph, so it can run on a worker thread while the graph is being edited.
+    """
+    path = config.SAVE_PATH if path is None else path
+    landmarks, hierarchy = graph.landmarks, graph.hierarchy
+
+    if path.endswith(BINARY_EXTENSION):
+        compact = CompactGraph.from_graph(graph)
+
+        def write():
+            write_binary(compact, path)
+    else:
+        # Convert the graph to a dictionary
+        graph_data = {
+            'nodes': [node.to_dict() for node in graph.nodes],
+            'edges': [edge.to_dict() for edge in graph.edges]
+        }
+
+        def write():
+            # Save the graph data to a JSON file
+            with open(path, 'w') as f:
+                json.dump(graph_data, f, indent=4)
+
+    def save():
+        with phase("save_graph"):
+            write()
+            print(f"Graph saved to {path}")
+
+            if landmarks is not None:
+                save_landmarks(landmarks, path)
+            if hierarchy is not None:
+                save_hierarchy(hierarchy, path)
+
+    return save
+
+
+def _read_json(path: str, progress=None):
+    """json.load in chunks, calling progress with the fraction of bytes read after each one"""
+    size = os.path.getsize(path) or 1
+    chunks = []
+    read = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(LOAD_CHUNK_BYTES), b''):
+            chunks.append(chunk)
+            read += len(chunk)
+            if progress is not None:
+                progress(read / size)
+    return json.loads(b''.join(chunks))
+
+
+def load_graph(graph, path: str = None, progress=None):
+    """
+    Loads a JSON or binary graph file (config.LOAD_PATH by default) into
+    graph, replacing its contents. progress is called with the fraction of the
+    file read so far. The file is parsed before graph is cleared, so a broken
+    file leaves graph as it was.
+    """
+    with phase("load_graph"):
+        return _load_graph(graph, config.LOAD_PATH if path is None else path, progress)
+
+
+def _load_graph(graph, path: str, progress):
+    if is_binary(path):
+        compact = read_binary(path)
+        if progress is not None:
+            progress(1.0)
+        compact.to_graph(graph)
+        graph.landmarks = load_landmarks(graph, path)
+        graph.hierarchy = load_hierarchy(graph, path)
+        return graph
+
+    graph_data = _read_json(path, progress)
+
+    graph.clear()
+
     node_map = {}
 
-    # Reconstruct nodes
+    # Reconstruct nodes, the graph decides which Node/Edge classes to build
     for node_data in graph_data['nodes']:
-        node = Node(
-            x=node_data['x'],
-            y=node_data['y'],
-            name=node_data['name']
-        )
-        node.root = node_data.get('root', False)
-        node.radius = node_data.get('radius', NODE_RADIUS)
-        node.value = node_data.get('value', 0)
+        node = graph.node_class.from_dict(node_data)
         graph.add_node(node)
         node_map[node.name] = node
 
     # Reconstruct edges
     for edge_data in graph_data['edges']:
-        start_node = node_map[edge_data['start']]
-        end_node = node_map[edge_data['end']]
-        edge = Edge(start=start_node, end=end_node)
-        edge.value = edge_data.get('value', 1)
-        graph.add_edge(edge)
+        graph.add_edge(graph.edge_class.from_dict(edge_data, node_map))
+
+    graph.landmarks = load_landmarks(graph, path)
+    graph.hierarchy = load_hierarchy(graph, path)
 
     return graph
 
-        
\ No newline at end of file
+
+def open_graph(path: str) -> CompactGraph:
+    """
+    Opens a graph file as a CompactGraph without building node objects.
+    Binary files are memory-mapped and open almost instantly.
+    """
+    return CompactGraph.from_file(path)
+
+
+def json_to_binary(json_path: str, binary_path: str):
+    """Converts a JSON graph file to the binary format"""
+    write_binary(CompactGraph.from_file(json_path), binary_path)
+
+
+def binary_to_json(binary_path: str, json_path: str):
+    """Converts a binary graph file back to JSON"""
+    with open(json_path, 'w') as f:
+        json.dump(read_binary(binary_path).to_dict(), f, indent=4)
+
+
+# Bytes of text handed to the parsers at a time by the streaming importers
+IMPORT_CHUNK_BYTES = 1 << 20
+
+
+def _open_text(path: str):
+    """Opens a text file for reading, gzip compressed files are recognised by their magic bytes"""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, 'rt') if compressed else open(path, 'r')
+
+
+def _chunks(f):
+    """Lists of lines read IMPORT_CHUNK_BYTES at a time"""
+    return iter(lambda: f.readlines(IMPORT_CHUNK_BYTES), [])
+
+
+def _report(path: str, lines: int, started: float, compact: CompactGraph):
+    seconds = max(time.perf_counter() - started, 1e-9)
+    print(f"Imported {path}: {compact.node_count} nodes, {compact.edge_count} edges, "
+          f"{lines} lines in {seconds:.2f}s ({lines / seconds:,.0f} lines/s)")
+
+
+def _parse_weights(tokens: list, weights: array) -> array:
+    """Appends the weight tokens, switching the column to floats on the first non-integer weight"""
+    if weights.typecode == 'q':
+        try:
+            weights.extend([int(token) for token in tokens])
+            return weights
+        except ValueError:
+            weights = array('d', weights)
+    weights.extend([float(token) for token in tokens])
+    return weights
+
+
+class _NodeNames:
+    """Assigns ids to node names in the order they are first seen"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def id(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node_id
+
+
+def _read_coordinates(path: str, node_id, xs: array, ys: array, skip=()) -> int:
+    """
+    Reads "name x y" rows into xs/ys, node_id maps a name to an id (None for
+    unknown nodes). Rows whose first field is in skip are ignored. Returns the
+    number of lines read.
+    """
+    lines = 0
+    with _open_text(path) as f:
+        for chunk in _chunks(f):
+            lines += len(chunk)
+            for line in chunk:
+                fields = line.replace(',', ' ').split()
+                if len(fields) < 3 or fields[0].startswith(('#', '%')) or fields[0] in skip:
+                    continue
+                try:
+                    x, y = float(fields[-2]), float(fields[-1])
+                except ValueError:
+                    continue  # header row
+                i = node_id(fields[-3])
+                if i is None or not 0 <= i < len(xs):
+                    continue
+                xs[i] = x
+                ys[i] = y
+    return lines
+
+
+def _lightest_per_pair(starts: array, ends: array, weights: array):
+    """Keeps the lightest of the arcs between every unordered node pair, in file order"""
+    starts_np, ends_np = np.frombuffer(starts, dtype=np.int64), np.frombuffer(ends, dtype=np.int64)
+    weights_np = np.frombuffer(weights, dtype=np.int64 if weights.typecode == 'q' else np.float64)
+    low, high = np.minimum(starts_np, ends_np), np.maximum(starts_np, ends_np)
+    # Sorted by pair and then weight, the first arc of every pair is the one to keep
+    order = np.lexsort((weights_np, high, low))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (low[order][1:] != low[order][:-1]) | (high[order][1:] != high[order][:-1])
+    kept = np.sort(order[first])
+    return (array('q', starts_np[kept].tobytes()), array('q', ends_np[kept].tobytes()),
+            array(weights.typecode, weights_np[kept].tobytes()))
+
+
+def import_dimacs(gr_path: str, co_path: str = None, symmetric: bool = True) -> CompactGraph:
+    """
+    Streams a DIMACS shortest path graph (.gr, "a u v w" arc lines) and the
+    optional coordinate file (.co, "v id x y" lines) into a CompactGraph.
+    Node names are the DIMACS ids. DIMACS road networks list every road as
+    two arcs; as our graphs are undirected, symmetric keeps one edge per node
+    pair, the lightest of its arcs. One-way arcs are kept as they are.
+    """
+    started = time.perf_counter()
+    lines = 0
+    node_count = 0
+    starts, ends, weights = array('q'), array('q'), array('q')
+
+    with _open_text(gr_path) as f:
+        for chunk in _chunks(f):
+            lines += len(chunk)
+            arc_starts, arc_ends, arc_weights = [], [], []
+            for line in chunk:
+                if line.startswith('a'):
+                    _, u, v, w = line.split()
+                    arc_starts.append(int(u) - 1)
+                    arc_ends.append(int(v) - 1)
+                    arc_weights.append(w)
+                elif line.startswith('p'):
+                    node_count = int(line.split()[2])
+            starts.extend(arc_starts)
+            ends.extend(arc_ends)
+            weights = _parse_weights(arc_weights, weights)
+    if symmetric:
+        starts, ends, weights = _lightest_per_pair(starts, ends, weights)
+
+    xs = array('d', [0.0]) * node_count
+    ys = array('d', [0.0]) * node_count
+    if co_path is not None:
+        lines += _read_coordinates(co_path, lambda name: int(name) - 1, xs, ys, skip=('p', 'c'))
+
+    compact = CompactGraph([str(i) for i in range(1, node_count + 1)], xs, ys, array('b', bytes(node_count)),
+                           starts, ends, weights)
+    _report(gr_path, lines, started, compact)
+    return compact
+
+
+def import_edge_list(path: str, coordinates: str = None, delimiter: str = None) -> CompactGraph:
+    """
+    Streams an edge list with one "start end [weight]" line per edge into a
+    CompactGraph. Fields are split on whitespace, or on delimiter when given
+    (CSV files go through the csv module, see import_csv). Lines starting with
+    # or % are comments, a missing weight is 1. coordinates is an optional
+    file of "name x y" lines that sets the node positions.
+    """
+    started = time.perf_counter()
+    lines = 0
+    nodes = _NodeNames()
+    starts, ends, weights = array('q'), array('q'), array('q')
+
+    with _open_text(path) as f:
+        for chunk in _chunks(f):
+            lines += len(chunk)
+            weights = _parse_weights(_append_rows((line.split(delimiter) for line in chunk), nodes, starts, ends), weights)
+
+    return _finish_import(path, lines, started, nodes, starts, ends, weights, coordinates)
+
+
+def import_csv(path: str, coordinates: str = None, header: bool = None) -> CompactGraph:
+    """
+    Like import_edge_list for CSV files with start,end[,weight] rows.
+    header tells whether the first row is a header, None detects it.
+    """
+    started = time.perf_counter()
+    lines = 0
+    nodes = _NodeNames()
+    starts, ends, weights = array('q'), array('q'), array('q')
+
+    with _open_text(path) as f:
+        for chunk in _chunks(f):
+            rows = csv.reader(chunk)
+            if lines == 0:
+                if header is None:
+                    try:
+                        header = csv.Sniffer().has_header(''.join(chunk[:64]))
+                    except csv.Error:
+                        header = False
+                if header:
+                    next(rows, None)
+            lines += len(chunk)
+            weights = _parse_weights(_append_rows(rows, nodes, starts, ends), weights)
+
+    return _finish_import(path, lines, started, nodes, starts, ends, weights, coordinates)
+
+
+def _append_rows(rows, nodes: _NodeNames, starts: array, ends: array) -> list:
+    """Appends the (start, end[, weight]) rows of one chunk, returns their weight tokens"""
+    node_id = nodes.id
+    chunk_starts, chunk_ends, weights = [], [], []
+    for fields in rows:
+        if len(fields) < 2 or not fields[0] or fields[0].startswith(('#', '%')):
+            continue
+        chunk_starts.append(node_id(fields[0].strip()))
+        chunk_ends.append(node_id(fields[1].strip()))
+        weights.append(fields[2].strip() if len(fields) > 2 and fields[2].strip() else '1')
+    starts.extend(chunk_starts)
+    ends.extend(chunk_ends)
+    return weights
+
+
+def _finish_import(path, lines, started, nodes: _NodeNames, starts, ends, weights, coordinates) -> CompactGraph:
+    node_count = len(nodes.names)
+    xs = array('d', [0.0]) * node_count
+    ys = array('d', [0.0]) * node_count
+    if coordinates is not None:
+        lines += _read_coordinates(coordinates, nodes.ids.get, xs, ys)
+
+    compact = CompactGraph(nodes.names, xs, ys, array('b', bytes(node_count)), starts, ends, weights)
+    _report(path, lines, started, compact)
+    return compact
+
+
+def import_graph(graph, path: str, coordinates: str = None):
+    """
+    Imports an external graph file into graph, replacing its contents.
+
+    .gr files are read as DIMACS (with the .co file next to them when there
+    is one), .csv files as CSV and anything else as a whitespace edge list;
+    a trailing .gz is ignored for the decision.
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.gr'):
+        if coordinates is None:
+            for candidate in (name[:-3] + '.co', name[:-3] + '.co.gz'):
+                if os.path.exists(candidate):
+                    coordinates = candidate
+                    break
+        compact = import_dimacs(path, coordinates)
+    elif name.endswith('.csv'):
+        compact = import_csv(path, coordinates)
+    else:
+        compact = import_edge_list(path, coordinates)
+    return compact.to_graph(graph)
+
+
+def sidecar_path(path: str, kind: str) -> str:
+    """Path of preprocessing data saved next to a graph file, graph_3.json -> graph_3.<kind>.json"""
+    root, _ = os.path.splitext(path)
+    return f"{root}.{kind}.json"
+
+
+def _read_sidecar(graph, path: str, kind: str):
+    """Returns the sidecar data when it exists and was computed for this graph, None otherwise"""
+    try:
+        with open(sidecar_path(path, kind), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get('fingerprint') != graph.content_hash():
+        return None
+    return data
+
+
+def save_landmarks(landmarks: Landmarks, path: str):
+    """Saves the ALT landmark table next to the graph file at path"""
+    with open(sidecar_path(path, "landmarks"), 'w') as f:
+        json.dump(landmarks.to_dict(), f)
+
+
+def load_landmarks(graph, path: str):
+    """
+    Loads the landmark table saved next to the graph file at path.
+    Returns None when there is none or it was computed for a different graph.
+    """
+    data = _read_sidecar(graph, path, "landmarks")
+    return Landmarks.from_dict(data, graph) if data is not None else None
+
+
+def save_hierarchy(hierarchy: ContractionHierarchy, path: str):
+    """Saves the contraction hierarchy next to the graph file at path"""
+    with open(sidecar_path(path, "ch"), 'w') as f:
+        json.dump(hierarchy.to_dict(), f)
+
+
+def load_hierarchy(graph, path: str):
+    """
+    Loads the contraction hierarchy saved next to the graph file at path.
+    Returns None when there is none or it was built for a different graph.
+    """
+    data = _read_sidecar(graph, path, "ch")
+    return ContractionHierarchy.from_dict(data, graph) if data is not None else None
@@ -0,0 +1,218 @@
+"""
+Point-to-point search variants used by Graph.find_shortest_path.
+
+Every function takes a core Graph (see graph_core.py) and returns a
+PathResult. They accept the same observer, queue and stats arguments as
+Graph.dijkstra_algorithm.
+"""
+import math
+
+from graph_core import PathResult, SearchStats, SolverObserver
+from priority_queues import make_queue
+
+INFINITY = float('infinity')
+
+
+def bidirectional_dijkstra(graph, start, end, observer: SolverObserver = None, queue: str = "heap",
+                           stats: SearchStats = None) -> PathResult:
+    """
+    Runs Dijkstra forward from start and backward from end at the same time.
+
+    Always expands the side with the smaller frontier. Every relaxed edge that
+    touches a node reached by the other side is a candidate meeting point;
+    the best candidate is final once the two queue minima add up to at least
+    its length. Returns the same distance as a plain Dijkstra, and the same
+    path whenever the shortest path is unique.
+    """
+    if start is end:
+        if observer is not None:
+            observer.target_found(end, 0)
+            observer.finished()
+        return PathResult([start], [], 0)
+
+    adjacency = graph.adjacency
+    max_weight = graph.max_edge_weight() if queue == "bucket" else None
+
+    distances = ({start: 0}, {end: 0})
+    previous = ({start: None}, {end: None})
+    settled = (set(), set())
+    queues = (make_queue(queue, max_weight), make_queue(queue, max_weight))
+    queues[0].push(start, 0)
+    queues[1].push(end, 0)
+    if stats is not None:
+        stats.pushes += 2
+
+    best = INFINITY
+    meeting = None  # (forward node, backward node, edge)
+
+    while queues[0] and queues[1]:
+        if queues[0].peek()[0] + queues[1].peek()[0] >= best:
+            break
+
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        distance, node = queues[side].pop()
+        if node in settled[side]:
+            if stats is not None:
+                stats.pops += 1
+                stats.stale_pops += 1
+            continue
+        settled[side].add(node)
+        if stats is not None:
+            stats.pops += 1
+            stats.settled += 1
+
+        own_distances = distances[side]
+        other_distances = distances[1 - side]
+
+        for neighbor, weight, edge in adjacency.get(node, []):
+            if neighbor in settled[side]:
+                continue
+            new_distance = distance + weight
+
+            if new_distance < own_distances.get(neighbor, INFINITY):
+                own_distances[neighbor] = new_distance
+                previous[side][neighbor] = node
+                queues[side].push(neighbor, new_distance)
+                if stats is not None:
+                    stats.relaxed += 1
+                    stats.pushes += 1
+                if observer is not None and side == 0:
+                    observer.node_relaxed(neighbor, new_distance, node)
+
+            other_distance = other_distances.get(neighbor)
+            if other_distance is not None and new_distance + other_distance < best:
+                best = new_distance + other_distance
+                meeting = (node, neighbor, edge) if side == 0 else (neighbor, node, edge)
+
+        if observer is not None:
+            observer.node_settled(node, distance)
+
+    if stats is not None:
+        stats.add_queue(queues[0])
+        stats.add_queue(queues[1])
+
+    if meeting is None:
+        if observer is not None:
+            observer.finished()
+        return PathResult([], [], None)
+
+    forward_node, backward_node, meeting_edge = meeting
+
+    # start -> forward_node through the forward tree
+    nodes = []
+    current_node = forward_node
+    while current_node is not None:
+        nodes.append(current_node)
+        current_node = previous[0][current_node]
+    nodes.reverse()
+
+    # backward_node -> end through the backward tree
+    current_node = backward_node
+    while current_node is not None:
+        nodes.append(current_node)
+        current_node = previous[1][current_node]
+
+    edges = []
+    for node, next_node in zip(nodes, nodes[1:]):
+        if node is forward_node and next_node is backward_node:
+            edges.append(meeting_edge)
+        else:
+            edges.append(graph.get_edge(node, next_node))
+
+    if observer is not None:
+        observer.target_found(end, best)
+        observer.finished()
+
+    return PathResult(nodes, edges, best)
+
+
+def _goal_directed_search(graph, start, end, heuristic, observer: SolverObserver, queue: str,
+                          stats: SearchStats) -> PathResult:
+    """
+    A* with a consistent heuristic: nodes are popped by distance + heuristic(node),
+    so once popped a node is settled just like in Dijkstra.
+    """
+    if queue == "bucket":
+        raise ValueError("The bucket queue needs integer priorities, use a heap queue for A* and ALT!")
+
+    adjacency = graph.adjacency
+    distances = {start: 0}
+    previous = {start: None}
+    settled = set()
+
+    pq = make_queue(queue)
+    pq.push(start, heuristic(start))
+    if stats is not None:
+        stats.pushes += 1
+
+    while pq:
+        _, node = pq.pop()
+        if node in settled:
+            if stats is not None:
+                stats.pops += 1
+                stats.stale_pops += 1
+            continue
+        settled.add(node)
+        if stats is not None:
+            stats.pops += 1
+            stats.settled += 1
+
+        distance = distances[node]
+        if node is end:
+            if observer is not None:
+                observer.target_found(node, distance)
+            break
+
+        for neighbor, weight, _ in adjacency.get(node, []):
+            if neighbor in settled:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, INFINITY):
+                distances[neighbor] = new_distance
+                previous[neighbor] = node
+                pq.push(neighbor, new_distance + heuristic(neighbor))
+                if stats is not None:
+                    stats.relaxed += 1
+                    stats.pushes += 1
+                if observer is not None:
+                    observer.node_relaxed(neighbor, new_distance, node)
+
+        if observer is not None:
+            observer.node_settled(node, distance)
+
+    if stats is not None:
+        stats.add_queue(pq)
+    if observer is not None:
+        observer.finished()
+
+    return graph.build_path(previous, distances, start, end)
+
+
+def astar(graph, start, end, observer: SolverObserver = None, queue: str = "heap",
+          stats: SearchStats = None, scale: float = None) -> PathResult:
+    """
+    A* search guided by the straight line distance to end.
+
+    The heuristic is scale * euclidean distance of the node coordinates. It is
+    admissible as long as no edge weighs less than scale times its length,
+    by default scale is the largest such value, Graph.heuristic_scale().
+    """
+    if scale is None:
+        scale = graph.heuristic_scale()
+    end_x, end_y = end.x, end.y
+
+    def heuristic(node):
+        return scale * math.hypot(node.x - end_x, node.y - end_y)
+
+    return _goal_directed_search(graph, start, end, heuristic, observer, queue, stats)
+
+
+def alt(graph, start, end, landmarks, observer: SolverObserver = None, queue: str = "heap",
+        stats: SearchStats = None) -> PathResult:
+    """A* search with landmark lower bounds, see landmarks.py"""
+    target_distances = landmarks.distances.get(end, ())
+
+    def heuristic(node):
+        return landmarks.lower_bound(node, target_distances)
+
+    return _goal_directed_search(graph, start, end, heuristic, observer, queue, stats)
@@ -0,0 +1,118 @@
+"""
+Uniform grid over node centers and edge bounding boxes for mouse hit-testing.
+
+The index only narrows down candidates; the exact tests stay in
+Node.mouse_over and Edge.mouse_over. It listens to the graph (see
+GraphListener), so added, removed and dragged nodes and edges update only the
+cells they touch.
+"""
+from typing import Dict, List, Set, Tuple
+
+from config import NODE_RADIUS
+from graph_core import GraphEdge, GraphListener, GraphNode
+
+# Side of a grid cell in pixels, a few node diameters
+CELL_SIZE = 128
+# Edge bounding boxes are padded because Edge.mouse_over accepts points slightly off the line
+EDGE_MARGIN = 16
+
+Cell = Tuple[int, int]
+
+
+class SpatialIndex(GraphListener):
+    def __init__(self, graph, cell_size: int = CELL_SIZE):
+        self.graph = graph
+        self.cell_size = cell_size
+
+        self.node_cells: Dict[Cell, Set[GraphNode]] = {}
+        self.edge_cells: Dict[Cell, Set[GraphEdge]] = {}
+        self._node_cell: Dict[GraphNode, Cell] = {}
+        self._edge_span: Dict[GraphEdge, List[Cell]] = {}
+        # Largest node radius seen, a node is hit within this distance of its center
+        self.max_radius = NODE_RADIUS
+
+        self.rebuild()
+
+    def rebuild(self):
+        """Indexes every node and edge of the graph from scratch"""
+        self.node_cells.clear()
+        self.edge_cells.clear()
+        self._node_cell.clear()
+        self._edge_span.clear()
+        for node in self.graph.nodes:
+            self._insert_node(node)
+        for edge in self.graph.edges:
+            self._insert_edge(edge)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _cells_in(self, left: float, top: float, right: float, bottom: float) -> List[Cell]:
+        first_column, first_row = self._cell(left, top)
+        last_column, last_row = self._cell(right, bottom)
+        return [(column, row) for column in range(first_column, last_column + 1) for row in range(first_row, last_row + 1)]
+
+    def _insert_node(self, node: GraphNode):
+        cell = self._cell(node.x, node.y)
+        self.node_cells.setdefault(cell, set()).add(node)
+        self._node_cell[node] = cell
+        self.max_radius = max(self.max_radius, getattr(node, 'radius', NODE_RADIUS))
+
+    def _remove_node(self, node: GraphNode):
+        cell = self._node_cell.pop(node, None)
+        if cell is not None:
+            self.node_cells[cell].discard(node)
+            if not self.node_cells[cell]:
+                del self.node_cells[cell]
+
+    def _insert_edge(self, edge: GraphEdge):
+        cells = self._cells_in(min(edge.start.x, edge.end.x) - EDGE_MARGIN, min(edge.start.y, edge.end.y) - EDGE_MARGIN,
+                               max(edge.start.x, edge.end.x) + EDGE_MARGIN, max(edge.start.y, edge.end.y) + EDGE_MARGIN)
+        for cell in cells:
+            self.edge_cells.setdefault(cell, set()).add(edge)
+        self._edge_span[edge] = cells
+
+    def _remove_edge(self, edge: GraphEdge):
+        for cell in self._edge_span.pop(edge, []):
+            self.edge_cells[cell].discard(edge)
+            if not self.edge_cells[cell]:
+                del self.edge_cells[cell]
+
+    def nodes_near(self, coords: tuple) -> List[GraphNode]:
+        """Nodes whose center lies within max_radius of coords, candidates for Node.mouse_over"""
+        x, y = coords
+        radius = self.max_radius
+        candidates = []
+        for cell in self._cells_in(x - radius, y - radius, x + radius, y + radius):
+            for node in self.node_cells.get(cell, ()):
+                if (node.x - x) ** 2 + (node.y - y) ** 2 <= radius ** 2:
+                    candidates.append(node)
+        return candidates
+
+    def edges_near(self, coords: tuple) -> List[GraphEdge]:
+        """Edges whose bounding box covers the cell of coords, candidates for Edge.mouse_over"""
+        return list(self.edge_cells.get(self._cell(*coords), ()))
+
+    # GraphListener
+
+    def node_added(self, node: GraphNode):
+        self._insert_node(node)
+
+    def node_removed(self, node: GraphNode):
+        self._remove_node(node)
+
+    def node_moved(self, node: GraphNode):
+        self._remove_node(node)
+        self._insert_node(node)
+        for _, _, edge in self.graph.adjacency.get(node, []):
+            self._remove_edge(edge)
+            self._insert_edge(edge)
+
+    def edge_added(self, edge: GraphEdge):
+        self._insert_edge(edge)
+
+    def edge_removed(self, edge: GraphEdge):
+        self._remove_edge(edge)
+
+    def graph_cleared(self):
+        self.rebuild()
@@ -0,0 +1,5 @@
+import os
+
+# The editor tests run headless, the dummy driver has no monitor to fit the window to
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("DIJKSTRA_SCREEN_SIZE", "1280,800")
@@ -0,0 +1,16 @@
+import config
+import saving
+import variables
+
+
+def test_overrides_after_import_reach_the_modules_that_use_them(tmp_path):
+    saved = config.SCREEN_SIZE, config.SAVE_PATH
+    try:
+        config.override(SCREEN_SIZE="1200,900", SAVE_PATH=str(tmp_path / "graph.json"))
+        assert variables.get_screen_size() == (1200, 900)
+
+        from graph_core import Graph
+        saving.save_graph(Graph())
+        assert (tmp_path / "graph.json").exists()
+    finally:
+        config.override(SCREEN_SIZE=saved[0], SAVE_PATH=saved[1])
@@ -0,0 +1,45 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import dijkstra
+from dijkstra_parts import Node, Edge
+
+
+def test_deleted_node_is_not_hovered_again():
+    pygame.init()
+    graph = dijkstra.Graph()
+    dijkstra.graph = graph
+    node = Node(200, 200)
+    graph.add_node(node)
+    graph.hover((200, 200))
+    assert graph.hovered_nodes == {node}
+
+    graph.remove_node(node)
+    graph.hover((201, 200))
+    renderer = dijkstra.get_renderer(graph)
+    renderer.track(graph.hovered_nodes)
+    assert node not in graph.hovered_nodes
+    assert node not in renderer.foreground_nodes
+
+
+def test_keys_that_leave_the_weight_unchanged_are_not_edits():
+    pygame.init()
+    graph = dijkstra.Graph()
+    dijkstra.graph = graph
+    start, end = Node(100, 100), Node(400, 100)
+    graph.add_node(start)
+    graph.add_node(end)
+    edge = Edge(start, end)
+    graph.add_edge(edge)
+    graph.select_edge(edge)
+    version = graph.version
+
+    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_LSHIFT))
+    dijkstra.event_handler([], graph)
+    assert graph.version == version
+
+    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_7))
+    dijkstra.event_handler([], graph)
+    assert edge.value == 17
+    assert graph.version == version + 1
@@ -0,0 +1,40 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import dijkstra
+from dijkstra_parts import Node, Edge
+
+
+def run_to_end(animation):
+    animation.skip_to_end()
+    while not animation.done:
+        animation.update(16)
+
+
+def test_dynamic_tree_hears_edits_made_while_a_result_is_shown():
+    pygame.init()
+    graph = dijkstra.Graph()
+    dijkstra.graph = graph
+    a, b, c, d = (Node(100 * i, 100) for i in range(1, 5))
+    for node in (a, b, c, d):
+        graph.add_node(node)
+    edges = {}
+    for start, end, value in ((a, b, 1), (b, c, 1), (a, d, 1), (d, c, 15)):
+        edges[start, end] = Edge(start, end)
+        edges[start, end].value = value
+        graph.add_edge(edges[start, end])
+
+    first = dijkstra.SolverAnimation(graph, a, c, "dynamic")
+    run_to_end(first)
+    assert first.distance == 2
+
+    # Closes the shown animation, which unregisters while the graph notifies its listeners
+    graph.set_edge_value(edges[a, b], 19)
+    assert first.closed
+
+    second = dijkstra.SolverAnimation(graph, a, c, "dynamic")
+    run_to_end(second)
+    assert second.distance == 16
+    assert second.distance == graph.find_shortest_path(a, c, method="dijkstra").distance
+    second.close()
@@ -1,67 +1,72 @@
-import pygame
-from screeninfo import get_monitors
-pygame.font.init()
+"""
+Display resources of the editor, created on first use.
+
+The constants of config.py import instantly. The window, the fonts and the
+monitor size need pygame and a display, so they are made the first time the
+editor reads variables.screen, variables.FONT, variables.SCORE_FONT,
+variables.SCREEN_WIDTH, variables.SCREEN_HEIGHT or variables.keypad_mapping
+(module __getattr__) and kept as plain globals from then on. Read them
+through the module; `from variables import screen` opens the window at
+import time.
+"""
+import config
+from config import *
+
+# Space left around the window on the monitor
+WINDOW_MARGIN = 80
 
 
 def get_screen_size():
+    """Size of the first monitor, SCREEN_SIZE in config.py overrides the probing"""
+    if config.SCREEN_SIZE is not None:
+        return config.SCREEN_SIZE
+    from screeninfo import get_monitors
     monitor = get_monitors()[0]
     return monitor.width, monitor.height
 
 
-# DEFINITIONS of time
-NEXT_NODE_WAIT_TIME = 300
-END_GAME_WAIT_TIME = 5000
-
-
-# DEFINITIONS of paths
-SAVE_PATH = "graph_3.json"
-LOAD_PATH = "graph_2.json"
+def _window_size():
+    width, height = get_screen_size()
+    return {'SCREEN_WIDTH': width - WINDOW_MARGIN, 'SCREEN_HEIGHT': height - WINDOW_MARGIN}
 
-# DEFINIONS of colors
 
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-LIGHT_GRAY = (200, 200, 200)
-DARK_GRAY = (100, 100, 100)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
+def _screen():
+    import pygame
+    return {'screen': pygame.display.set_mode((__getattr__('SCREEN_WIDTH'), __getattr__('SCREEN_HEIGHT')))}
 
-# DEFINITIONS of sizes
-NODE_RADIUS = 30
-BORDER_WIDTH = 3
 
-SCREEN_WIDTH, SCREEN_HEIGHT = get_screen_size()
-SCREEN_HEIGHT -= 80
-SCREEN_WIDTH -= 80
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+def _fonts():
+    import pygame
+    pygame.font.init()
+    return {
+        'FONT': pygame.font.SysFont('Arial', FONT_SIZE, bold=True),
+        'SCORE_FONT': pygame.font.SysFont('Arial', 30, bold=True),
+    }
 
 
-# DEFINITIONS of edges
-EDGE_THICKNESS = 5
+def _keypad_mapping():
+    import pygame
+    # Number mapping
+    return {'keypad_mapping': {getattr(pygame, f"K_KP{digit}"): str(digit) for digit in range(10)}}
 
-RADIUS_INWARD = 1
-TOLERANCE = 0.12
 
-# DEFINITIONS of fonts
-FONT_SIZE = 10
-FONT = pygame.font.SysFont('Arial', FONT_SIZE, bold=True)
-SCORE_FONT = pygame.font.SysFont('Arial', 30, bold=True)
-
-# DEFINITIONS of FPS
-MAX_FPS = 60
-
-# Number mapping
-keypad_mapping = {
-    pygame.K_KP0: '0',
-    pygame.K_KP1: '1',
-    pygame.K_KP2: '2',
-    pygame.K_KP3: '3',
-    pygame.K_KP4: '4',
-    pygame.K_KP5: '5',
-    pygame.K_KP6: '6',
-    pygame.K_KP7: '7',
-    pygame.K_KP8: '8',
-    pygame.K_KP9: '9'
+# Lazy attribute -> function creating it (and the attributes made along with it)
+_FACTORIES = {
+    'SCREEN_WIDTH': _window_size,
+    'SCREEN_HEIGHT': _window_size,
+    'screen': _screen,
+    'FONT': _fonts,
+    'SCORE_FONT': _fonts,
+    'keypad_mapping': _keypad_mapping,
 }
 
+
+def __getattr__(name: str):
+    # Also called directly by the factories, which may find the attribute already made
+    if name not in globals():
+        try:
+            factory = _FACTORIES[name]
+        except KeyError:
+            raise AttributeError(f"module 'variables' has no attribute {name!r}") from None
+        globals().update(factory())
+    return globals()[name]